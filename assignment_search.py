@@ -0,0 +1,184 @@
+import copy
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional
+
+from bdr_analysis import BDRAnalysis
+from model import as_dict_model
+from wcrt_analysis import RTAEngine
+from greedy_core_assigner import assign_components, apply_assignment, component_servers
+
+# A component that misses its deadlines outweighs any bandwidth saving.
+PENALTY = 100.0
+SLACK_WEIGHT = 0.1
+
+
+class AssignmentScorer:
+    """Scores assignments (top-level component -> core id) core by core.
+    A core's score depends only on the set of components placed on it, so it
+    is cached on that set and a move or swap re-scores at most two cores."""
+
+    def __init__(self, system_model):
+        self.model = system_model
+        self.analyser = BDRAnalysis(system_model)
+        self.cores = {core["core_id"]: core for core in system_model["cores"]}
+        self.components = {}
+        self.homes = {}
+        for core in system_model["cores"]:
+            for comp in core["components"]:
+                self.components[comp["name"]] = comp
+                self.homes[comp["name"]] = core
+        self._servers = {}
+        self._core_scores = {}
+        self.evaluations = 0
+
+    def servers(self, name, core_id):
+        core = self.cores[core_id]
+        key = (name, core["speed_factor"])
+        if key not in self._servers:
+            self._servers[key] = component_servers(self.analyser, self.components[name],
+                                                   self.homes[name]["speed_factor"], core)
+        return self._servers[key]
+
+    def core_score(self, core_id, names):
+        # (violations, bandwidth, slack): violations counts components that
+        # miss deadlines, slack is 1 - U on EDF cores and the smallest
+        # (P - R) / P over the servers on RM cores.
+        key = (core_id, names)
+        if key in self._core_scores:
+            return self._core_scores[key]
+        self.evaluations += 1
+        violations = 0
+        servers = []
+        for name in names:
+            s = self.servers(name, core_id)
+            if s is None:
+                violations += 1
+            else:
+                servers.extend(s)
+        U = sum(s["Q"] / s["P"] for s in servers)
+
+        if self.cores[core_id]["scheduler"].upper() in ("RM", "FPS"):
+            servers.sort(key=BDRAnalysis.server_priority_key)
+            engine = RTAEngine([s["Q"] for s in servers], [s["P"] for s in servers],
+                               [s["J"] for s in servers])
+            slack = 1.0
+            for i, s in enumerate(servers):
+                R = engine.solve(i, s["Q"], s["P"])
+                slack = min(slack, (s["P"] - R) / s["P"])
+            ok = slack >= -1e-9
+        else:
+            slack = 1.0 - U
+            ok = U <= 1.0 + 1e-9
+        if not ok:
+            violations = len(names)
+            slack = max(min(slack, 0.0), -1.0)
+
+        score = (violations, U, slack)
+        self._core_scores[key] = score
+        return score
+
+    def score(self, assignment):
+        per_core = {core_id: [] for core_id in self.cores}
+        for name, core_id in assignment.items():
+            per_core[core_id].append(name)
+        return {core_id: self.core_score(core_id, frozenset(names)) for core_id, names in per_core.items()}
+
+    @staticmethod
+    def cost(scores):
+        violations = sum(s[0] for s in scores.values())
+        bandwidth = sum(s[1] for s in scores.values())
+        min_slack = min(s[2] for s in scores.values())
+        return PENALTY * violations + bandwidth - SLACK_WEIGHT * min_slack
+
+    @staticmethod
+    def summary(scores):
+        return {
+            "violations": sum(s[0] for s in scores.values()),
+            "bandwidth": sum(s[1] for s in scores.values()),
+            "min_slack": min(s[2] for s in scores.values()),
+        }
+
+
+def _anneal(system_model, start, seed, deadline, T0=0.05):
+    # One simulated-annealing chain over move/swap neighbours, run until the
+    # wall-clock `deadline`; the temperature falls linearly towards it.
+    rng = random.Random(seed)
+    scorer = AssignmentScorer(system_model)
+    core_ids = list(scorer.cores)
+    names = list(start)
+
+    current = dict(start)
+    scores = scorer.score(current)
+    cost = scorer.cost(scores)
+    best, best_cost = dict(current), cost
+    iterations = 0
+
+    t_start = time.time()
+    span = max(deadline - t_start, 1e-9)
+    while True:
+        now = time.time()
+        if now >= deadline or len(core_ids) < 2:
+            break
+        iterations += 1
+        T = T0 * (deadline - now) / span + 1e-6
+
+        a = rng.choice(names)
+        if rng.random() < 0.5:
+            moves = {a: rng.choice([c for c in core_ids if c != current[a]])}
+        else:
+            b = rng.choice(names)
+            if current[a] == current[b]:
+                continue
+            moves = {a: current[b], b: current[a]}
+
+        touched = {current[n] for n in moves} | set(moves.values())
+        candidate = dict(current, **moves)
+        new_scores = dict(scores)
+        for core_id in touched:
+            on_core = frozenset(n for n, c in candidate.items() if c == core_id)
+            new_scores[core_id] = scorer.core_score(core_id, on_core)
+        new_cost = scorer.cost(new_scores)
+
+        if new_cost <= cost or rng.random() < math.exp((cost - new_cost) / T):
+            current, scores, cost = candidate, new_scores, new_cost
+            if cost < best_cost - 1e-12:
+                best, best_cost = dict(current), cost
+
+    result = scorer.summary(scorer.score(best))
+    result.update({"assignment": best, "cost": best_cost, "iterations": iterations,
+                   "evaluations": scorer.evaluations, "seed": seed})
+    return result
+
+
+def search_assignment(system_model: Dict[str, Any], time_budget: float = 5.0, chains: Optional[int] = None,
+                      seed: int = 0, apply: bool = False, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    # Runs `chains` independent annealing chains in a process pool until
+    # `time_budget` seconds of wall time have passed and keeps the cheapest
+    # result. Chain 0 starts from the FFD placement, the others from random ones.
+    model = as_dict_model(system_model)
+    ffd = assign_components(copy.deepcopy(model), strategy="ffd")
+    homes = {comp["name"]: core["core_id"] for core in model["cores"] for comp in core["components"]}
+    start = {name: core_id if core_id is not None else homes[name] for name, core_id in ffd.items()}
+    core_ids = [core["core_id"] for core in model["cores"]]
+
+    chains = chains or max_workers or os.cpu_count() or 1
+    deadline = time.time() + time_budget
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        for k in range(chains):
+            rng = random.Random(seed + k)
+            init = start if k == 0 else {name: rng.choice(core_ids) for name in start}
+            futures.append(pool.submit(_anneal, model, init, seed + k, deadline))
+        results = [f.result() for f in futures]
+
+    best = min(results, key=lambda r: r["cost"])
+    best["chains"] = chains
+    best["evaluations"] = sum(r["evaluations"] for r in results)
+    best["iterations"] = sum(r["iterations"] for r in results)
+    if apply:
+        apply_assignment(system_model, best["assignment"])
+    return best
@@ -0,0 +1,151 @@
+import argparse
+import contextlib
+import csv
+import glob
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from main import run_case
+
+
+def expand_case_folders(patterns):
+    folders = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for path in matches:
+            path = os.path.normpath(path)
+            if os.path.isfile(os.path.join(path, "tasks.csv")):
+                if path not in folders:
+                    folders.append(path)
+            elif os.path.isdir(path):
+                print(f"Skipping {path}: no tasks.csv")
+            else:
+                print(f"Skipping {path}: not found")
+    return folders
+
+
+def case_names(folders):
+    # Output files are keyed on the folder name; folders that share a name
+    # (e.g. a/case1 and b/case1) are keyed on their path below the common
+    # prefix instead so they don't overwrite each other's .csv/.log/trace.
+    names = [os.path.basename(folder) for folder in folders]
+    if len(set(names)) < len(names):
+        common = os.path.commonpath([os.path.abspath(f) for f in folders])
+        names = [os.path.relpath(os.path.abspath(f), common).replace(os.sep, "__") for f in folders]
+    if len(set(names)) < len(names):
+        raise ValueError("case folders map to clashing output names: " + ", ".join(folders))
+    return names
+
+
+def _run_case_job(folder, name, out_dir, options, trace_format=None):
+    # Each case logs to its own file so concurrent runs don't interleave output.
+    solution = os.path.join(out_dir, f"{name}.csv")
+    log_path = os.path.join(out_dir, f"{name}.log")
+    trace_file = os.path.join(out_dir, f"{name}_trace.{trace_format}") if trace_format else None
+    start = time.perf_counter()
+    # A failing case is reported in its row (traceback in its log) so the rest still run.
+    with open(log_path, "w") as log, contextlib.redirect_stdout(log):
+        try:
+            summary = run_case(folder, output_csv=solution, trace_file=trace_file, **options)
+            status = "ok" if summary else "missing files"
+        except Exception as exc:
+            traceback.print_exc(file=log)
+            summary, status = None, f"error: {type(exc).__name__}: {exc}"
+    row = {"case": name, "folder": folder, "status": status}
+    row.update(summary or {})
+    row["wall_time_s"] = round(time.perf_counter() - start, 3)
+    row["log"] = log_path
+    return row
+
+
+SUMMARY_FIELDS = ["case", "status", "tasks", "missed_deadlines", "components",
+                  "schedulable_components", "wall_time_s", "solution", "log", "folder"]
+
+
+def write_summary(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def print_summary(rows):
+    print(f"{'case':<32} {'status':<14} {'tasks':>5} {'missed':>7} {'sched comps':>12} {'time [s]':>9}")
+    for r in rows:
+        comps = f"{r.get('schedulable_components', '-')}/{r.get('components', '-')}"
+        print(f"{r['case']:<32} {r['status']:<14} {r.get('tasks', '-'):>5} "
+              f"{r.get('missed_deadlines', '-'):>7} {comps:>12} {r['wall_time_s']:>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run analysis + simulation for one or more test case folders in parallel.")
+    parser.add_argument("cases", nargs="+", help="case folders or glob patterns, e.g. 'test_cases/*'")
+    parser.add_argument("--out-dir", default="results", help="where solution CSVs, logs and the summary go")
+    parser.add_argument("--sim-time", type=float, default=1800.0, help="simulation horizon")
+    parser.add_argument("--dt", type=float, default=0.1, help="tick length for --sim-mode tick")
+    parser.add_argument("--sim-mode", choices=["tick", "event"], default="tick")
+    parser.add_argument("--steady-state", choices=["off", "extrapolate", "stop"], default="off",
+                        help="detect a repeating schedule at hyperperiod boundaries")
+    parser.add_argument("--tuner", action="store_true", help="run the resource-model tuner")
+    parser.add_argument("--tuner-mode", choices=["linear", "bisect", "synthesize"], default="linear")
+    parser.add_argument("--core-assigner", action="store_true", help="run the core assigner")
+    parser.add_argument("--assigner-mode", choices=["greedy", "ffd", "bfd", "wfd", "anneal"], default="greedy")
+    parser.add_argument("--assign-budget", type=float, default=5.0, help="seconds of search for --assigner-mode anneal")
+    parser.add_argument("--comm-links", action="store_true", help="load comm_links.csv jitter")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--profile", action="store_true", help="write <case>_profile.json/.csv per case")
+    parser.add_argument("--trace", choices=["csv", "bin"], help="write a per-case event trace in this format")
+    parser.add_argument("--sensitivity", action="store_true", help="write <case>_margins.csv per case")
+    parser.add_argument("--monte-carlo", type=int, default=0, metavar="N",
+                        help="write <case>_montecarlo.csv from N randomized simulation runs per case")
+    parser.add_argument("--model-cache", help="directory for cached parsed models (reused while CSVs are unchanged)")
+    args = parser.parse_args(argv)
+
+    folders = expand_case_folders(args.cases)
+    if not folders:
+        parser.error("no test case folders matched")
+    try:
+        names = case_names(folders)
+    except ValueError as exc:
+        parser.error(str(exc))
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    options = {
+        "simulation_time": args.sim_time,
+        "dt": args.dt,
+        "sim_mode": args.sim_mode,
+        "steady_state": args.steady_state,
+        "use_tuner": args.tuner,
+        "tuner_mode": args.tuner_mode,
+        "use_core_assigner": args.core_assigner,
+        "assigner_mode": args.assigner_mode,
+        "assign_time_budget": args.assign_budget,
+        "use_comm_links": args.comm_links,
+        "profile": args.profile,
+        "model_cache": args.model_cache,
+        "sensitivity": args.sensitivity,
+        "monte_carlo": args.monte_carlo,
+        "quiet_load": True,
+    }
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(_run_case_job, folder, name, args.out_dir, options, args.trace)
+                   for folder, name in zip(folders, names)]
+        rows = []
+        for folder, name, future in zip(folders, names, futures):
+            try:
+                rows.append(future.result())
+            except Exception as exc:  # e.g. a worker killed by the OS
+                rows.append({"case": name, "folder": folder, "wall_time_s": 0.0,
+                             "status": f"error: {type(exc).__name__}: {exc}"})
+
+    summary_path = os.path.join(args.out_dir, "summary.csv")
+    write_summary(rows, summary_path)
+    print_summary(rows)
+    print(f"\n Summary written to: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
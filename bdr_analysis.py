@@ -1,20 +1,55 @@
 import math
-from functools import reduce
-from math import lcm
-from dbf_utils import dbf_edf, dbf_fps
-from wcrt_analysis import compute_wcrt, compute_wcrt_edf, compute_wcrt_rm
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import instrumentation
+from model import as_dict_model
+from dbf_utils import np, dbf_edf_array, dbf_fps_array, exceeds, iter_deadline_points, MAX_TEST_POINTS, demand_horizon, hyperperiod, utilization
+from wcrt_analysis import RTAEngine, compute_wcrt, compute_wcrt_edf, compute_wcrt_rm
+
+
+class AnalysisCache:
+    """Bounded LRU map from a component fingerprint to its analysis result."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self.entries), "maxsize": self.maxsize}
 
 
 class BDRAnalysis:
-    def __init__(self, system_model):
-        self.system_model = system_model
+    def __init__(self, system_model, cache_size=512):
+        self.system_model = as_dict_model(system_model)
+        self.cache = AnalysisCache(cache_size)
+        self._core_components = {}
 
     @staticmethod
     def half_half_to_qp(alpha: float, delta: float):
+        # Inverse of alpha = Q/P, delta = 2(P - Q) as used by analyze_component.
         if not (0 < alpha < 1):
             raise ValueError("Half-Half only valid for 0 < α < 1.")
-        P = delta / (1 - alpha)
-        Q = (alpha * P) / 2
+        P = delta / (2 * (1 - alpha))
+        Q = alpha * P
         return Q, P
 
     @staticmethod
@@ -27,13 +62,29 @@ class BDRAnalysis:
             return t
         return max(0.0, math.floor(t / P) * Q)
 
+    @staticmethod
+    def sbf_bdr_array(alpha, delta, ts):
+        if np is None:
+            return [BDRAnalysis.sbf_bdr(alpha, delta, t) for t in ts]
+        ts = np.asarray(ts, dtype=float)
+        return np.where(ts <= delta, 0.0, alpha * (ts - delta))
+
+    @staticmethod
+    def sbf_prm_array(Q, P, ts):
+        if np is None:
+            return [BDRAnalysis.sbf_prm(Q, P, t) for t in ts]
+        ts = np.asarray(ts, dtype=float)
+        if Q == P:
+            return ts
+        return np.maximum(0.0, np.floor(ts / P) * Q)
+
     @staticmethod
     def lcm(a, b):
         return abs(a * b) // math.gcd(int(a), int(b))
 
     @staticmethod
     def lcm_of_periods(periods):
-        return int(reduce(BDRAnalysis.lcm, periods))
+        return hyperperiod(periods)
 
     @staticmethod
     def dbf_server(Q, P, J, t):
@@ -42,37 +93,106 @@ class BDRAnalysis:
         n_jobs = math.floor((t - (J + P)) / P) + 1
         return n_jobs * Q
 
+    @staticmethod
+    def dbf_server_array(Q, P, J, ts):
+        if np is None:
+            return [BDRAnalysis.dbf_server(Q, P, J, t) for t in ts]
+        ts = np.asarray(ts, dtype=float)
+        n_jobs = np.floor((ts - (J + P)) / P) + 1
+        return np.where(ts < J + P, 0.0, n_jobs * Q)
+
+    @staticmethod
+    def _demand_test(tasks, dbf, horizon, bdr_supply, prm_supply):
+        # Walks the deadline points in time order and stops once both
+        # supplies have failed, instead of building every point up to horizon.
+        # With U close to alpha the horizon is the full LCM, so the walk is
+        # also capped at MAX_TEST_POINTS, past which the test fails.
+        bdr_ok = prm_ok = True
+        n_points = 0
+        for points in iter_deadline_points(tasks, horizon):
+            if n_points >= MAX_TEST_POINTS:
+                return False, False, n_points
+            demand = dbf(tasks, points)
+            n_points += len(points)
+            bdr_ok = bdr_ok and not exceeds(demand, bdr_supply(points))
+            prm_ok = prm_ok and not exceeds(demand, prm_supply(points))
+            if not (bdr_ok or prm_ok):
+                break
+        return bdr_ok, prm_ok, n_points
+
+    @staticmethod
+    def server_priority_key(server):
+        # Servers without an explicit priority fall back to rate-monotonic order.
+        prio = server["priority"]
+        return (prio is None, prio if prio is not None else 0, server["P"])
+
+    @staticmethod
+    def component_fingerprint(comp, speed_factor):
+        # Built from values, not object identity, so in-place edits of
+        # comp["bdr_init"] or task fields by the tuner produce a new key.
+        tasks = tuple((t["id"], t["wcet"], t["period"], t["deadline"], t.get("priority"),
+                       t.get("comm_jitter", 0.0)) for t in comp["tasks"])
+        return (comp["scheduler"].upper(), comp["bdr_init"]["Q"], comp["bdr_init"]["P"],
+                speed_factor, tasks)
+
+    @staticmethod
+    def _copy_result(result):
+        return {model: dict(res, wcrt=dict(res["wcrt"])) for model, res in result.items()}
+
     def analyze_component(self, comp, speed_factor):
+        key = self.component_fingerprint(comp, speed_factor)
+        cached = self.cache.get(key)
+        if cached is None:
+            instrumentation.count("analysis_cache_misses")
+            with instrumentation.phase("analyze_component", comp["name"]):
+                cached = self._analyze_component(comp, speed_factor)
+            self.cache.put(key, cached)
+        else:
+            instrumentation.count("analysis_cache_hits")
+        result, Q, P, delta, ok = cached
+        # run_analysis flags results in place, so callers always get a private copy.
+        return self._copy_result(result), Q, P, delta, ok
+
+    def _analyze_component(self, comp, speed_factor):
         tasks = comp["tasks"]
         sched = comp["scheduler"].upper()
         Q = comp["bdr_init"]["Q"]
         P = comp["bdr_init"]["P"]
         alpha = Q / P
         delta = 2 * (P - Q)
-        dbf = dbf_edf if sched == "EDF" else dbf_fps
+        dbf = dbf_edf_array if sched == "EDF" else dbf_fps_array
 
         periods = [t["period"] for t in tasks]
         deadlines = [t["deadline"] for t in tasks]
-        H = max(self.lcm_of_periods(periods), int(2 * max(deadlines)))
+        H = max(self.lcm_of_periods(periods), 2 * max(deadlines))
+        prm_delay = 0.0 if Q == P else P
+        horizon = max(demand_horizon(tasks, alpha, delta, H),
+                      demand_horizon(tasks, alpha, prm_delay, H))
+
+        if utilization(tasks) > alpha + 1e-9:
+            # Demand outgrows alpha*t, so some point fails; no need to find it.
+            bdr_ok = prm_ok = False
+            n_points = 0
+        else:
+            bdr_ok, prm_ok, n_points = self._demand_test(
+                tasks, dbf, horizon,
+                lambda ts: self.sbf_bdr_array(alpha, delta, ts),
+                lambda ts: self.sbf_prm_array(Q, P, ts))
+        if instrumentation.ENABLED:
+            instrumentation.record("hyperperiod", comp["name"], H)
+            instrumentation.record("test_points", comp["name"], n_points)
+            instrumentation.count("dbf_evaluations", n_points * len(tasks))
 
         # BDR analysis
-        bdr_ok = True
-        for t in range(H + 1):
-            if dbf(tasks, t) > self.sbf_bdr(alpha, delta, t) + 1e-9:
-                bdr_ok = False
-                break
-        bdr_wcrt = compute_wcrt(tasks, sched, alpha, delta)
+        with instrumentation.phase("wcrt"):
+            bdr_wcrt = compute_wcrt(tasks, sched, alpha, delta)
 
         # PRM analysis
-        prm_ok = True
-        for t in range(H + 1):
-            if dbf(tasks, t) > self.sbf_prm(Q, P, t) + 1e-9:
-                prm_ok = False
-                break
-        if sched == "EDF":
-            prm_wcrt = compute_wcrt_edf(tasks, alpha, 0.0)
-        else:
-            prm_wcrt = compute_wcrt_rm(tasks, 0.0)
+        with instrumentation.phase("wcrt"):
+            if sched == "EDF":
+                prm_wcrt = compute_wcrt_edf(tasks, alpha, 0.0)
+            else:
+                prm_wcrt = compute_wcrt_rm(tasks, 0.0)
 
         for task in tasks:
             if prm_wcrt[task["id"]] > task["deadline"]:
@@ -97,65 +217,133 @@ class BDRAnalysis:
 
         return result, Q, P, delta, bdr_ok and prm_ok
 
-    def run_analysis(self):
+    def run_analysis(self, parallel=False, max_workers=None):
+        # parallel=True spreads the component tests and then the per-core
+        # server tests over a process pool; the result dict is the same.
+        if parallel:
+            return self._run_analysis_parallel(max_workers)
         results = {}
         for core in self.system_model["cores"]:
-            c_id = core["core_id"]
-            core_sched = core["scheduler"].upper()
-            results[c_id] = {}
+            results[core["core_id"]] = self.analyze_core(core["core_id"])
+        return results
 
-            core_servers = []
+    @staticmethod
+    def iter_components(core):
+        def recurse(comp):
+            yield comp
+            for sub in comp.get("subcomponents", []):
+                yield from recurse(sub)
 
-            for comp in core["components"]:
-                def recurse(comp):
-                    cname = comp["name"]
-                    res, Q, P, delta, ok = self.analyze_component(comp, core["speed_factor"])
-                    results[c_id][cname] = res
+        for comp in core["components"]:
+            yield from recurse(comp)
 
-                    core_servers.append({
-                        "Q": Q, "P": P, "J": delta,
-                        "priority": comp.get("priority"),
-                        "name": cname,
-                        "ok_inside": ok
-                    })
+    def analyze_core(self, core_id, changed_component=None):
+        # Re-checks a single core. With changed_component set, only that
+        # component is re-analysed; the others reuse their last results.
+        core = next(c for c in self.system_model["cores"] if c["core_id"] == core_id)
+        known = self._core_components.setdefault(core_id, {})
+        for comp in self.iter_components(core):
+            cname = comp["name"]
+            if changed_component is None or cname == changed_component or cname not in known:
+                known[cname] = self.analyze_component(comp, core["speed_factor"])
 
-                    for sub in comp.get("subcomponents", []):
-                        recurse(sub)
+        results, core_servers = self._assemble_core(core)
+        if all(s["ok_inside"] for s in core_servers):
+            with instrumentation.phase("core_server_test", core_id):
+                ok = self.servers_schedulable(core["scheduler"].upper(), core_servers)
+            if not ok:
+                self._flag_core(results, core_servers)
+        return results
 
-                recurse(comp)
+    def forget_component(self, core_id, name):
+        # Drops a component's last result from a core, e.g. after it moved away.
+        self._core_components.get(core_id, {}).pop(name, None)
 
-            if not all(s["ok_inside"] for s in core_servers):
-                continue
+    def _assemble_core(self, core):
+        known = self._core_components[core["core_id"]]
+        results = {}
+        core_servers = []
+        for comp in self.iter_components(core):
+            cname = comp["name"]
+            res, Q, P, delta, ok = known[cname]
+            results[cname] = self._copy_result(res)
+            core_servers.append({
+                "Q": Q, "P": P, "J": delta,
+                "priority": comp.get("priority"),
+                "name": cname,
+                "ok_inside": ok
+            })
+        return results, core_servers
 
-            if core_sched == "EDF":
-                periods = [int(s["P"]) for s in core_servers]
-                H_core = lcm(*periods)
-                for t in range(H_core + 1):
-                    demand = sum(self.dbf_server(s["Q"], s["P"], s["J"], t) for s in core_servers)
-                    if demand > t + 1e-9:
-                        for s in core_servers:
-                            results[c_id][s["name"]]["bdr"]["schedulable"] = False
-                            results[c_id][s["name"]]["prm"]["schedulable"] = False
-                        break
-            else:
-                hp_sorted = sorted(core_servers, key=lambda s: s["priority"])
-                for i, s in enumerate(hp_sorted):
-                    R = s["Q"]
-                    while True:
-                        I = sum(
-                            math.ceil((R + hp["J"]) / hp["P"]) * hp["Q"]
-                            for hp in hp_sorted[:i]
-                        )
-                        if I + s["Q"] == R:
-                            break
-                        if I + s["Q"] > s["P"]:
-                            for ss in core_servers:
-                                results[c_id][ss["name"]]["bdr"]["schedulable"] = False
-                                results[c_id][ss["name"]]["prm"]["schedulable"] = False
-                            break
-                        R = I + s["Q"]
-                    else:
+    @staticmethod
+    def _flag_core(results, core_servers):
+        for s in core_servers:
+            results[s["name"]]["bdr"]["schedulable"] = False
+            results[s["name"]]["prm"]["schedulable"] = False
+
+    def _run_analysis_parallel(self, max_workers):
+        cores = self.system_model["cores"]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            pending = []
+            for core in cores:
+                known = self._core_components.setdefault(core["core_id"], {})
+                for comp in self.iter_components(core):
+                    key = self.component_fingerprint(comp, core["speed_factor"])
+                    cached = self.cache.get(key)
+                    if cached is not None:
+                        known[comp["name"]] = cached
                         continue
+                    job = {k: comp[k] for k in ("name", "scheduler", "bdr_init", "tasks")}
+                    pending.append((known, comp["name"], key,
+                                    pool.submit(_analyze_component_job, job, core["speed_factor"])))
+            for known, cname, key, future in pending:
+                known[cname] = future.result()
+                self.cache.put(key, known[cname])
+
+            assembled = {}
+            for core in cores:
+                results, core_servers = self._assemble_core(core)
+                future = None
+                if all(s["ok_inside"] for s in core_servers):
+                    future = pool.submit(_servers_schedulable_job, core["scheduler"].upper(), core_servers)
+                assembled[core["core_id"]] = (results, core_servers, future)
+
+            out = {}
+            for c_id, (results, core_servers, future) in assembled.items():
+                if future is not None and not future.result():
+                    self._flag_core(results, core_servers)
+                out[c_id] = results
+        return out
+
+    def servers_schedulable(self, core_sched, core_servers):
+        if core_sched == "EDF":
+            # sum(dbf_server) <= U*t, so below full utilisation nothing can fail,
+            # and above it the demand eventually outgrows the core.
+            U_core = sum(s["Q"] / s["P"] for s in core_servers)
+            return U_core <= 1.0 + 1e-9
+
+        hp_sorted = sorted(core_servers, key=self.server_priority_key)
+        engine = RTAEngine([s["Q"] for s in hp_sorted], [s["P"] for s in hp_sorted],
+                           [s["J"] for s in hp_sorted])
+        for i, s in enumerate(hp_sorted):
+            R = s["Q"]
+            while True:
+                engine.iterations += 1
+                I = engine.interference(i, R)
+                if I + s["Q"] == R:
                     break
+                if I + s["Q"] > s["P"]:
+                    return False
+                R = I + s["Q"]
+            else:
+                continue
+            break
+        return True
 
-        return results
+
+def _analyze_component_job(comp, speed_factor):
+    return BDRAnalysis({"cores": []}, cache_size=0)._analyze_component(comp, speed_factor)
+
+
+def _servers_schedulable_job(core_sched, core_servers):
+    return BDRAnalysis({"cores": []}, cache_size=0).servers_schedulable(core_sched, core_servers)
@@ -0,0 +1,213 @@
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from task_loader import load_csv_files
+from simulator import HierarchicalSimulator
+from bdr_analysis import BDRAnalysis
+from resource_tuner import tune_system
+from greedy_core_assigner import assign_components_to_cores, assign_components
+from assignment_search import search_assignment
+
+
+def find_case_folders(root="test_cases"):
+    folders = []
+    for dirpath, _, filenames in os.walk(root):
+        if "tasks.csv" in filenames:
+            folders.append(dirpath)
+    return sorted(folders)
+
+
+def _load(folder):
+    return load_csv_files(os.path.join(folder, "tasks.csv"),
+                          os.path.join(folder, "architecture.csv"),
+                          os.path.join(folder, "budgets.csv"))
+
+
+def scale_model(system_model, factor):
+    # Synthetic scale-up: `factor` renamed copies of every core, so the task,
+    # component and core counts all grow linearly.
+    cores = []
+    for k in range(factor):
+        for core in system_model["cores"]:
+            clone = copy.deepcopy(core)
+            clone["core_id"] = f"{core['core_id']}_x{k}"
+
+            def rename(comp):
+                comp["name"] = f"{comp['name']}_x{k}"
+                for task in comp["tasks"]:
+                    task["id"] = f"{task['id']}_x{k}"
+                for sub in comp.get("subcomponents", []):
+                    rename(sub)
+
+            for comp in clone["components"]:
+                rename(comp)
+            cores.append(clone)
+    return {"cores": cores}
+
+
+def _count_tasks(system_model):
+    return sum(len(comp["tasks"]) for core in system_model["cores"]
+               for comp in BDRAnalysis.iter_components(core))
+
+
+def _stage_load(folder, model, opts):
+    m = _load(folder)
+    return {"tasks": _count_tasks(m)}
+
+
+def _stage_simulate(folder, model, opts):
+    res = HierarchicalSimulator(model).run_simulation(opts.sim_time, opts.dt, mode=opts.sim_mode)
+    stats = res["task_stats"].values()
+    return {"jobs": sum(s["num_completed_jobs"] + s["missed_deadlines"] for s in stats)}
+
+
+def _stage_analyze(folder, model, opts):
+    analyzer = BDRAnalysis(model)
+    analyzer.run_analysis()
+    return {"component_analyses": analyzer.cache.misses}
+
+
+def _stage_tune(folder, model, opts):
+    return {"analyses": tune_system(model, mode=opts.tuner_mode)["analyses"]}
+
+
+def _stage_assign(folder, model, opts):
+    if opts.assigner_mode == "greedy":
+        return {"components": len(assign_components_to_cores(model))}
+    if opts.assigner_mode == "anneal":
+        best = search_assignment(model, time_budget=opts.assign_budget)
+        return {"components": len(best["assignment"]), "evaluations": best["evaluations"]}
+    return {"components": len(assign_components(model, strategy=opts.assigner_mode))}
+
+
+STAGES = {
+    "load": _stage_load,
+    "simulate": _stage_simulate,
+    "analyze": _stage_analyze,
+    "tune": _stage_tune,
+    "assign": _stage_assign,
+}
+
+
+def measure(stage, folder, model, opts):
+    # Timed runs go without tracemalloc, which slows allocation-heavy code
+    # several-fold; peak memory comes from one extra traced run.
+    best = None
+    for _ in range(opts.repeat):
+        work = copy.deepcopy(model) if model is not None else None
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            ops = STAGES[stage](folder, work, opts)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best["time_s"]:
+            best = {"time_s": elapsed, "ops": ops}
+
+    work = copy.deepcopy(model) if model is not None else None
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        STAGES[stage](folder, work, opts)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best["peak_kb"] = peak / 1024
+    return best
+
+
+def case_label(folder):
+    # Keys must not depend on how the folder was typed ("./test_cases/x/",
+    # an absolute path, ...), or a baseline silently matches nothing.
+    rel = os.path.relpath(os.path.abspath(folder), os.path.abspath("test_cases"))
+    return rel if not rel.startswith("..") else os.path.normpath(folder)
+
+
+def run_benchmarks(opts):
+    results = {}
+    for folder in opts.cases or find_case_folders():
+        name = case_label(folder)
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = _load(folder)
+        variants = [(name, model, True)]
+        variants += [(f"{name}@x{k}", scale_model(model, k), False) for k in opts.scale]
+        for label, m, from_csv in variants:
+            for stage in opts.stages:
+                if stage == "load" and not from_csv:
+                    continue
+                r = measure(stage, folder, m, opts)
+                results[f"{label}/{stage}"] = r
+                print(f"{label:<40} {stage:<9} {r['time_s']:>9.4f}s {r['peak_kb']:>10.1f} KiB  {r['ops']}")
+    return results
+
+
+def compare(results, baseline, threshold):
+    # A stage regresses when its time or peak memory grows by more than
+    # `threshold` (relative) over the baseline; tiny timings are ignored.
+    # Also returns how many keys were found in the baseline at all.
+    regressions = []
+    matched = 0
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        matched += 1
+        for metric, floor in (("time_s", 1e-3), ("peak_kb", 64.0)):
+            if cur[metric] > max(base[metric], floor) * (1 + threshold):
+                regressions.append((key, metric, base[metric], cur[metric]))
+    return regressions, matched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the loader, simulator, analysis, tuner and assigner.")
+    parser.add_argument("cases", nargs="*", help="case folders (default: every folder under test_cases/)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--scale", nargs="*", type=int, default=[], help="also run k-times scaled copies")
+    parser.add_argument("--sim-time", type=float, default=1800.0)
+    parser.add_argument("--dt", type=float, default=0.1)
+    parser.add_argument("--sim-mode", choices=["tick", "event"], default="tick")
+    parser.add_argument("--tuner-mode", choices=["linear", "bisect", "synthesize"], default="linear")
+    parser.add_argument("--assigner-mode", choices=["greedy", "ffd", "bfd", "wfd", "anneal"], default="greedy")
+    parser.add_argument("--assign-budget", type=float, default=5.0, help="seconds of search for --assigner-mode anneal")
+    parser.add_argument("--repeat", type=int, default=1, help="keep the fastest of N runs")
+    parser.add_argument("--save", help="write results to this JSON baseline file")
+    parser.add_argument("--compare", help="compare against this JSON baseline file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    opts = parser.parse_args(argv)
+
+    results = run_benchmarks(opts)
+
+    if opts.save:
+        meta = {"python": platform.python_version(), "platform": platform.platform(),
+                "sim_time": opts.sim_time, "dt": opts.dt, "sim_mode": opts.sim_mode,
+                "tuner_mode": opts.tuner_mode, "assigner_mode": opts.assigner_mode,
+                "assign_budget": opts.assign_budget}
+        with open(opts.save, "w") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+        print(f"\n Baseline written to: {opts.save}")
+
+    if opts.compare:
+        with open(opts.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions, matched = compare(results, baseline, opts.threshold)
+        if not matched:
+            print(f"\n Error: none of the {len(results)} measured stages appear in {opts.compare} "
+                  f"({len(baseline)} entries); check the case paths, --scale and --stages.")
+            return 2
+        if matched < len(results):
+            print(f"\n Warning: {len(results) - matched} of {len(results)} stages have no baseline entry.")
+        if regressions:
+            print(f"\n {len(regressions)} regression(s) beyond {opts.threshold:.0%}:")
+            for key, metric, old, new in regressions:
+                print(f"   {key:<50} {metric:<8} {old:.4f} → {new:.4f}")
+            return 1
+        print(f"\n No regressions beyond {opts.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,17 @@
+import heapq
 import math
+from fractions import Fraction
+from functools import reduce
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the *_array helpers fall back to lists.
+    np = None
+
+# A demand test that would walk more points than this (U within a hair of
+# alpha over a huge hyperperiod) gives up and reports a violation instead.
+MAX_TEST_POINTS = 10 ** 6
+
 
 def dbf_edf(tasks, t):
     demand = 0.0
@@ -11,3 +24,78 @@ def dbf_edf(tasks, t):
 
 def dbf_fps(tasks, t):
     return dbf_edf(tasks, t)
+
+def utilization(tasks):
+    return sum(task["wcet"] / task["period"] for task in tasks)
+
+def hyperperiod(periods):
+    # lcm(a/b, c/d) = lcm(a, c) / gcd(b, d), so non-integer periods are not truncated.
+    fracs = [Fraction(p).limit_denominator(10 ** 6) for p in periods]
+    num = reduce(math.lcm, (f.numerator for f in fracs))
+    den = reduce(math.gcd, (f.denominator for f in fracs))
+    H = Fraction(num, den)
+    return int(H) if H.denominator == 1 else float(H)
+
+def deadline_points(tasks, horizon):
+    # dbf only steps at absolute deadlines k*T + D, and every supply bound
+    # is non-decreasing, so these are the only points an exact test needs.
+    pts = set()
+    for task in tasks:
+        D, T = task["deadline"], task["period"]
+        k = 0
+        while D + k * T <= horizon + 1e-9:
+            pts.add(D + k * T)
+            k += 1
+    pts = sorted(pts)
+    return np.array(pts, dtype=float) if np is not None else pts
+
+def iter_deadline_points(tasks, horizon, chunk=4096):
+    # The points of deadline_points in increasing order, `chunk` at a time,
+    # so a test can stop at its first violation without building the whole set.
+    heap = [(task["deadline"], 0, task["deadline"], task["period"]) for task in tasks]
+    heapq.heapify(heap)
+    batch, last = [], None
+    while heap and heap[0][0] <= horizon + 1e-9:
+        x, k, D, T = heapq.heappop(heap)
+        if x != last:
+            batch.append(x)
+            last = x
+            if len(batch) == chunk:
+                yield np.array(batch, dtype=float) if np is not None else batch
+                batch = []
+        heapq.heappush(heap, (D + (k + 1) * T, k + 1, D, T))
+    if batch:
+        yield np.array(batch, dtype=float) if np is not None else batch
+
+def demand_horizon(tasks, alpha, delay, H):
+    # dbf(t) <= U*t + sum(U_i * max(0, T_i - D_i)); once that line stays under
+    # alpha*(t - delay) no later point can fail, so testing beyond it is wasted.
+    U = utilization(tasks)
+    slack = sum(max(0.0, task["period"] - task["deadline"]) * task["wcet"] / task["period"]
+                for task in tasks)
+    if U >= alpha - 1e-12:
+        # At U = alpha the bound only clears the supply with no slack and no delay.
+        return 0.0 if slack == 0 and delay == 0 else H
+    return min(H, (alpha * delay + slack) / (alpha - U))
+
+def dbf_edf_array(tasks, ts):
+    # Demand of all tasks at every point of ts in one (tasks x points) operation.
+    if np is None:
+        return [dbf_edf(tasks, t) for t in ts]
+    ts = np.asarray(ts, dtype=float)
+    if not tasks:
+        return np.zeros_like(ts)
+    C = np.array([task["wcet"] for task in tasks], dtype=float)[:, None]
+    T = np.array([task["period"] for task in tasks], dtype=float)[:, None]
+    D = np.array([task["deadline"] for task in tasks], dtype=float)[:, None]
+    n_jobs = np.floor((ts - D) / T + 1)
+    n_jobs = np.where(ts >= D, np.maximum(n_jobs, 0.0), 0.0)
+    return (n_jobs * C).sum(axis=0)
+
+def dbf_fps_array(tasks, ts):
+    return dbf_edf_array(tasks, ts)
+
+def exceeds(demand, supply, eps=1e-9):
+    if np is None:
+        return any(d > s + eps for d, s in zip(demand, supply))
+    return bool(np.any(np.asarray(demand) > np.asarray(supply) + eps))
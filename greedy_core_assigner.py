@@ -1,10 +1,15 @@
-from typing import Dict, Any
+import copy
+from typing import Dict, Any, Optional
+
+from bdr_analysis import BDRAnalysis
+from model import as_dict_model, sync_typed_model
+from wcrt_analysis import RTAEngine
 
 
 def assign_components_to_cores(system_model: Dict[str, Any]) -> Dict[str, str]:
     components = []
     core_speeds = {}
-    for core in system_model["cores"]:
+    for core in as_dict_model(system_model)["cores"]:
         core_id = core["core_id"]
         core_speeds[core_id] = core["speed_factor"]
         for comp in core["components"]:
@@ -37,3 +42,170 @@ def assign_components_to_cores(system_model: Dict[str, Any]) -> Dict[str, str]:
         comp["original"]["parent_core"] = best_core
 
     return assignments
+
+
+STRATEGIES = ("ffd", "bfd", "wfd")
+
+
+def _scale_component(comp, ratio):
+    # WCETs and budgets in the model are in time units of the core the
+    # component sits on; ratio = old speed / new speed moves them to another.
+    comp["bdr_init"]["Q"] *= ratio
+    for task in comp["tasks"]:
+        task["wcet"] *= ratio
+        if "effective_wcet" in task:
+            task["effective_wcet"] *= ratio
+    for sub in comp.get("subcomponents", []):
+        _scale_component(sub, ratio)
+
+
+class CoreAdmission:
+    """Servers admitted to one core so far. The admission test only redoes
+    the part of the BDRAnalysis server-level test that a new component changes:
+    the utilisation bound on EDF cores, and on RM cores the response times of
+    the levels at or below the new servers, warm-started from their last value."""
+
+    def __init__(self, core, analyser):
+        self.core_id = core["core_id"]
+        self.speed = core["speed_factor"]
+        self.rm = core["scheduler"].upper() in ("RM", "FPS")
+        self.analyser = analyser
+        self.servers = []
+        self.response = []
+        self.utilization = 0.0
+
+    def try_admit(self, new_servers):
+        # Returns the state to commit with admit(), or None if the core would fail.
+        U = self.utilization + sum(s["Q"] / s["P"] for s in new_servers)
+        if not self.rm:
+            # The core-level EDF test is the U <= 1 bound itself, so admission
+            # defers to it rather than keeping its own copy of the threshold.
+            servers = self.servers + new_servers
+            if self.analyser.servers_schedulable("EDF", servers):
+                return servers, [], U
+            return None
+
+        merged = sorted([(s, R) for s, R in zip(self.servers, self.response)] +
+                        [(s, None) for s in new_servers], key=lambda e: BDRAnalysis.server_priority_key(e[0]))
+        servers = [s for s, _ in merged]
+        engine = RTAEngine([s["Q"] for s in servers], [s["P"] for s in servers],
+                           [s["J"] for s in servers])
+        response = []
+        changed = False
+        for i, (s, R_old) in enumerate(merged):
+            if R_old is not None and not changed:
+                response.append(R_old)
+                continue
+            # Added interference only raises a level's response time, so the
+            # old value is a valid starting point for the fixed-point iteration.
+            changed = True
+            R = engine.solve(i, s["Q"], s["P"], R_old or 0.0)
+            if R > s["P"] + 1e-9:
+                return None
+            response.append(R)
+        return servers, response, U
+
+    def admit(self, state):
+        self.servers, response, self.utilization = state
+        if self.rm:
+            self.response = response
+
+
+def component_servers(analyser, comp, home_speed, core):
+    # Server list for `comp` (and its subcomponents) once moved to `core`,
+    # or None if it is not schedulable inside its rescaled interface there.
+    ratio = home_speed / core["speed_factor"]
+    clone = copy.deepcopy(comp)
+    if ratio != 1.0:
+        _scale_component(clone, ratio)
+    servers = []
+    for c in BDRAnalysis.iter_components({"components": [clone]}):
+        _, Q, P, delta, ok = analyser.analyze_component(c, core["speed_factor"])
+        if not ok:
+            return None
+        servers.append({"Q": Q, "P": P, "J": delta, "priority": c.get("priority"), "name": c["name"]})
+    return servers
+
+
+def assign_components(system_model: Dict[str, Any], strategy: str = "ffd",
+                      apply: bool = False) -> Dict[str, Optional[str]]:
+    # First-, best- or worst-fit decreasing over the top-level components
+    # (sorted by bandwidth in work units), admitting each one only where the
+    # core stays schedulable. Components no core admits map to None and stay
+    # where they are. apply=True moves the placed components in the model.
+    strategy = strategy.lower()
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown assignment strategy: {strategy}")
+
+    model = as_dict_model(system_model)
+    analyser = BDRAnalysis(model)
+    cores = model["cores"]
+    admission = {core["core_id"]: CoreAdmission(core, analyser) for core in cores}
+
+    items = []
+    for core in cores:
+        for comp in core["components"]:
+            work = sum(c["bdr_init"]["Q"] / c["bdr_init"]["P"]
+                       for c in BDRAnalysis.iter_components({"components": [comp]}))
+            items.append((work * core["speed_factor"], comp, core))
+    items.sort(key=lambda item: -item[0])
+
+    # Speeds repeat across cores, so the rescaled in-component test is shared.
+    servers_cache = {}
+    assignments = {}
+    homes = {}
+    for _, comp, home in items:
+        best = None
+        for core in cores:
+            key = (comp["name"], core["speed_factor"])
+            if key not in servers_cache:
+                servers_cache[key] = component_servers(analyser, comp, home["speed_factor"], core)
+            servers = servers_cache[key]
+            if servers is None:
+                continue
+            adm = admission[core["core_id"]]
+            state = adm.try_admit(servers)
+            if state is None:
+                continue
+            if strategy == "ffd":
+                best = (adm, state)
+                break
+            if best is None or (strategy == "bfd" and state[2] > best[1][2]) or \
+                    (strategy == "wfd" and state[2] < best[1][2]):
+                best = (adm, state)
+
+        homes[comp["name"]] = home
+        if best is None:
+            assignments[comp["name"]] = None
+            continue
+        best[0].admit(best[1])
+        assignments[comp["name"]] = best[0].core_id
+
+    if apply:
+        apply_assignment(model, assignments, homes)
+        sync_typed_model(system_model, model)
+    return assignments
+
+
+def apply_assignment(system_model: Dict[str, Any], assignments: Dict[str, Optional[str]],
+                     homes: Optional[Dict[str, Any]] = None) -> None:
+    # Moves top-level components to their assigned cores, rescaling WCETs and
+    # budgets to the new core speed. Unassigned (None) components stay put.
+    if not isinstance(system_model, dict):
+        model = as_dict_model(system_model)
+        apply_assignment(model, assignments)
+        sync_typed_model(system_model, model)
+        return
+    cores = {core["core_id"]: core for core in system_model["cores"]}
+    if homes is None:
+        homes = {comp["name"]: core for core in system_model["cores"] for comp in core["components"]}
+    for name, core_id in assignments.items():
+        home = homes[name]
+        if core_id is None or core_id == home["core_id"]:
+            continue
+        comp = next(c for c in home["components"] if c["name"] == name)
+        home["components"].remove(comp)
+        target = cores[core_id]
+        _scale_component(comp, home["speed_factor"] / target["speed_factor"])
+        comp["parent_core"] = core_id
+        target["components"].append(comp)
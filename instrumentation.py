@@ -0,0 +1,107 @@
+import csv
+import json
+import time
+from collections import defaultdict
+
+# Off by default. Every call site checks ENABLED (or gets the shared no-op
+# context from phase()) once per call, never inside inner loops, so a disabled
+# run pays a flag check per component/simulation rather than per DBF point.
+ENABLED = False
+
+timers = defaultdict(float)
+calls = defaultdict(int)
+counters = defaultdict(int)
+tables = defaultdict(dict)
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("name", "item", "start")
+
+    def __init__(self, name, item):
+        self.name = name
+        self.item = item
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        timers[self.name] += elapsed
+        calls[self.name] += 1
+        if self.item is not None:
+            table = tables[f"{self.name}_time"]
+            table[self.item] = table.get(self.item, 0.0) + elapsed
+        return False
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+def reset():
+    timers.clear()
+    calls.clear()
+    counters.clear()
+    tables.clear()
+
+
+def phase(name, item=None):
+    # Times a block under `name`; with `item` the time is also kept per item
+    # (e.g. per component) so slow outliers can be found.
+    return _Phase(name, item) if ENABLED else _NULL_PHASE
+
+
+def count(name, n=1):
+    if ENABLED:
+        counters[name] += n
+
+
+def record(table, key, value):
+    if ENABLED:
+        tables[table][key] = value
+
+
+def add(table, key, value):
+    if ENABLED:
+        t = tables[table]
+        t[key] = t.get(key, 0) + value
+
+
+def report():
+    return {
+        "timers": {name: {"seconds": timers[name], "calls": calls[name]} for name in timers},
+        "counters": dict(counters),
+        "tables": {name: dict(t) for name, t in tables.items()},
+    }
+
+
+def write_report(json_path, csv_path=None):
+    data = report()
+    with open(json_path, "w") as f:
+        json.dump(data, f, indent=2)
+    if csv_path:
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["kind", "name", "key", "value"])
+            for name, t in data["timers"].items():
+                writer.writerow(["timer", name, "seconds", f"{t['seconds']:.6f}"])
+                writer.writerow(["timer", name, "calls", t["calls"]])
+            for name, value in data["counters"].items():
+                writer.writerow(["counter", name, "", value])
+            for name, table in data["tables"].items():
+                for key, value in table.items():
+                    writer.writerow(["table", name, key, value])
+    return data
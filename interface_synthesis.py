@@ -0,0 +1,205 @@
+import math
+from typing import Dict, Any, Optional
+
+from bdr_analysis import BDRAnalysis
+from dbf_utils import dbf_edf_array, demand_horizon, iter_deadline_points, hyperperiod, utilization
+from model import as_dict_model, sync_typed_model
+
+
+# Bandwidths within this margin of U are not searched unless the hull covers
+# the whole hyperperiod: as alpha approaches U the binding points move out to it.
+ALPHA_MARGIN = 1e-3
+
+
+def _demand_hull(tasks, alpha_floor):
+    # Upper convex hull of the DBF step points (t, dbf(t)). A supply line
+    # alpha*(t - Δ) stays above every point iff it stays above the hull, so
+    # only its vertices constrain (alpha, Δ). Δ(alpha) is below the first
+    # deadline, so for alpha >= alpha_floor no point past the demand_horizon
+    # bound with that delay can bind, and for alpha >= U none past H can either:
+    # dbf(t + H) <= dbf(t) + U*H. Returns the hull and whether it reached H.
+    H = max(hyperperiod([t["period"] for t in tasks]), 2 * max(t["deadline"] for t in tasks))
+    horizon = demand_horizon(tasks, alpha_floor, min(t["deadline"] for t in tasks), H)
+    hull = []
+    for points in iter_deadline_points(tasks, horizon):
+        for t, d in zip(list(points), list(dbf_edf_array(tasks, points))):
+            t, d = float(t), float(d)
+            while len(hull) >= 2:
+                (t1, d1), (t2, d2) = hull[-2], hull[-1]
+                if (d2 - d1) * (t - t1) <= (d - d1) * (t2 - t1):
+                    hull.pop()
+                else:
+                    break
+            hull.append((t, d))
+    return hull, horizon >= H
+
+
+def _rta_delay_cap(tasks):
+    # Largest Δ that keeps compute_wcrt_rm within every deadline. Level i
+    # passes iff C_i + J_i + Δ + W_i(t) <= t at some scheduling point t <= D_i
+    # (D_i or a release of a higher-priority task), W_i being the interference.
+    order = sorted(tasks, key=lambda t: t["priority"])
+    cap = float("inf")
+    for i, task in enumerate(order):
+        hp = order[:i]
+        D = task["deadline"]
+        pts = {D}
+        for h in hp:
+            pts.update(k * h["period"] for k in range(1, int(D // h["period"]) + 1))
+        best = max(t - task["wcet"] - task.get("comm_jitter", 0.0)
+                   - sum(math.ceil(t / h["period"]) * h["wcet"] for h in hp) for t in pts)
+        cap = min(cap, best)
+    # R == D passes, so stay clear of float noise at the boundary.
+    return cap - 1e-9 * max(1.0, abs(cap))
+
+
+class InterfaceFront:
+    """Feasible BDR interfaces of one component: for a bandwidth alpha the
+    largest tolerable delay is delay(alpha) = min over hull vertices of
+    t - dbf(t)/alpha, capped on RM components by the RTA delay bound. It
+    grows with alpha, so every alpha >= alpha_min is Pareto-optimal."""
+
+    def __init__(self, tasks, cap=float("inf")):
+        self.utilization = utilization(tasks)
+        self.hull, complete = _demand_hull(tasks, self.utilization + ALPHA_MARGIN)
+        self.cap = cap
+        # The hull is only exact above alpha_floor (see _demand_hull).
+        self.alpha_floor = self.utilization if complete else self.utilization + ALPHA_MARGIN
+        # delay(alpha) > 0 iff alpha > d/t at every vertex.
+        self.alpha_min = max([self.alpha_floor] + [d / t for t, d in self.hull])
+
+    def delay(self, alpha):
+        if alpha < self.alpha_floor or alpha <= 0:
+            return float("-inf")
+        return min(self.cap, min(t - d / alpha for t, d in self.hull))
+
+    def breakpoints(self):
+        # (alpha, Δ, Q, P) where the binding hull vertex changes, from
+        # alpha_min up to the point where the RTA cap takes over.
+        alphas = {self.alpha_min}
+        for (t1, d1), (t2, d2) in zip(self.hull, self.hull[1:]):
+            alphas.add((d2 - d1) / (t2 - t1))
+        if self.cap < float("inf"):
+            if any(t <= self.cap for t, _ in self.hull):
+                top = 1.0
+            else:
+                top = max(d / (t - self.cap) for t, d in self.hull)
+            alphas.add(top)
+            alphas = {a for a in alphas if a <= top}
+        front = []
+        for alpha in sorted(a for a in alphas if self.alpha_min <= a < 1):
+            delta = self.delay(alpha)
+            if delta > 0:
+                Q, P = BDRAnalysis.half_half_to_qp(alpha, delta)
+                front.append({"alpha": alpha, "delta": delta, "Q": Q, "P": P})
+        return front
+
+    def min_bandwidth(self, period, tol=1e-9):
+        # Smallest alpha whose interface reaches `period`: the mapped period
+        # delay(alpha) / (2(1 - alpha)) grows with alpha, so it is bisected.
+        # Returns (alpha, Δ) with Δ = 2*period*(1 - alpha) <= delay(alpha).
+        def reaches(alpha):
+            return self.delay(alpha) >= 2 * period * (1 - alpha)
+
+        lo, hi = self.alpha_min, 1.0
+        if reaches(lo):
+            hi = lo
+        while hi - lo > tol:
+            mid = (lo + hi) / 2
+            if reaches(mid):
+                hi = mid
+            else:
+                lo = mid
+        if hi >= 1.0:
+            return None
+        return hi, 2 * period * (1 - hi)
+
+
+def _child_demand(name, iface):
+    # A child's BDR server seen as a task of its parent: Q every P, due
+    # Δ + P after release, which is the dbf_server demand used at core level.
+    return {"id": name, "wcet": iface["Q"], "period": iface["P"],
+            "deadline": iface["delta"] + iface["P"], "priority": None}
+
+
+def synthesize_component(analyser, comp, speed, period=None, children=(), tol=1e-6):
+    # Minimum-bandwidth interface of one component at the given period
+    # (its budgets.csv period by default), checked once with analyze_component.
+    # A rounding case the DBF/RTA bounds miss (e.g. EDF with jitter) falls back
+    # to bisecting Q on the real test.
+    tasks = comp["tasks"]
+    if not tasks:
+        return None
+    P = period or comp["bdr_init"]["P"]
+    demand = list(tasks) + [_child_demand(name, iface) for name, iface in children]
+    cap = _rta_delay_cap(tasks) if comp["scheduler"].upper() != "EDF" else float("inf")
+    front = InterfaceFront(demand, cap)
+
+    result = {"front": front.breakpoints(), "analyses": 0, "verified": False}
+    chosen = front.min_bandwidth(P)
+    if chosen is None:
+        return result
+    alpha, delta = chosen
+    Q, P = BDRAnalysis.half_half_to_qp(alpha, delta)
+
+    Q0, P0 = comp["bdr_init"]["Q"], comp["bdr_init"]["P"]
+
+    def passes(Q):
+        result["analyses"] += 1
+        comp["bdr_init"]["Q"], comp["bdr_init"]["P"] = Q, P
+        res, *_ = analyser.analyze_component(comp, speed)
+        return res["bdr"]["schedulable"]
+
+    try:
+        if not passes(Q):
+            lo, hi = Q, P
+            if not passes(hi):
+                return result
+            while hi - lo > tol * P:
+                mid = (lo + hi) / 2
+                if passes(mid):
+                    hi = mid
+                else:
+                    lo = mid
+            Q = hi
+    finally:
+        comp["bdr_init"]["Q"], comp["bdr_init"]["P"] = Q0, P0
+
+    result.update({"alpha": Q / P, "delta": 2 * (P - Q), "Q": Q, "P": P, "verified": True})
+    return result
+
+
+def synthesize_interfaces(system_model: Dict[str, Any], period: Optional[float] = None,
+                          nested: bool = False, apply: bool = False) -> Dict[str, Any]:
+    # One pass per component, children before parents. With nested=True a
+    # parent's demand also includes its children's synthesized servers (the
+    # classic compositional view); by default each component only carries its
+    # own tasks, matching how BDRAnalysis places subcomponents on the core.
+    model = as_dict_model(system_model)
+    analyser = BDRAnalysis(model)
+    found = {}
+
+    def visit(comp, speed):
+        children = []
+        for sub in comp.get("subcomponents", []):
+            iface = visit(sub, speed)
+            if iface is not None and "Q" in iface:
+                children.append((sub["name"], iface))
+        iface = synthesize_component(analyser, comp, speed, period, children if nested else ())
+        found[comp["name"]] = iface
+        if iface is not None and "Q" in iface:
+            print(f"   • {comp['name']}: α {comp['bdr_init']['Q'] / comp['bdr_init']['P']:.3f}→"
+                  f"{iface['alpha']:.3f}, Δ {2 * (comp['bdr_init']['P'] - comp['bdr_init']['Q']):.2f}→"
+                  f"{iface['delta']:.2f}")
+            if apply:
+                comp["bdr_init"]["Q"], comp["bdr_init"]["P"] = iface["Q"], iface["P"]
+        elif iface is not None:
+            print(f"   • {comp['name']}: no feasible interface at P={period or comp['bdr_init']['P']:g}")
+        return iface
+
+    for core in model["cores"]:
+        for comp in core["components"]:
+            visit(comp, core["speed_factor"])
+    if apply:
+        sync_typed_model(system_model, model)
+    return found
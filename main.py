@@ -3,8 +3,13 @@ from task_loader import load_csv_files
 from simulator import HierarchicalSimulator
 from bdr_analysis import BDRAnalysis
 from solution_writer import write_solution_csv
-from greedy_core_assigner import assign_components_to_cores
+from greedy_core_assigner import assign_components_to_cores, assign_components
 from resource_tuner import tune_system
+from assignment_search import search_assignment
+from trace_sink import TraceSink
+from sensitivity import compute_margins, write_margins_csv
+from monte_carlo import run_monte_carlo, write_monte_carlo_csv
+import instrumentation
 
 def main():
     ################################################################
@@ -31,40 +36,93 @@ def main():
 
     OUTPUT_CSV = "solution.csv"
     USE_TUNER = False;
+    TUNER_MODE = "linear"  # "linear" (P0//k candidates), "bisect" or "synthesize"
     USE_CORE_ASSIGNER = False;
-
-    tasks_csv = os.path.join(TEST_CASE_FOLDER, "tasks.csv")
-    arch_csv = os.path.join(TEST_CASE_FOLDER, "architecture.csv")
-    budgets_csv = os.path.join(TEST_CASE_FOLDER, "budgets.csv")
+    ASSIGNER_MODE = "greedy"  # "greedy" (alpha/speed packing), "ffd"/"bfd"/"wfd" (admission-tested) or "anneal"
+    ASSIGN_TIME_BUDGET = 5.0  # seconds of search for ASSIGNER_MODE = "anneal"
+    SIM_MODE = "tick"  # "tick" (fixed dt) or "event" (discrete-event)
+    STEADY_STATE = "off"  # "extrapolate" (skip repeated hyperperiods up to the horizon) or "stop" (end at the first repeat within the horizon)
+    PROFILE = False  # write <solution>_profile.json/.csv with timings and counters
+    TRACE_FILE = None  # e.g. "trace.csv" or "trace.bin" to log every job/budget event
+    MODEL_CACHE = None  # e.g. ".model_cache" to reuse the parsed model while the CSVs are unchanged
+    SENSITIVITY = False  # write <solution>_margins.csv with WCET and core-speed margins
+    MONTE_CARLO = 0  # e.g. 1000 to write <solution>_montecarlo.csv from that many randomized runs
+
+    run_case(TEST_CASE_FOLDER, output_csv=OUTPUT_CSV, sim_mode=SIM_MODE, steady_state=STEADY_STATE,
+             use_tuner=USE_TUNER, tuner_mode=TUNER_MODE, use_core_assigner=USE_CORE_ASSIGNER,
+             assigner_mode=ASSIGNER_MODE, assign_time_budget=ASSIGN_TIME_BUDGET, profile=PROFILE,
+             trace_file=TRACE_FILE, model_cache=MODEL_CACHE, sensitivity=SENSITIVITY,
+             monte_carlo=MONTE_CARLO)
+
+def run_case(test_case_folder, output_csv="solution.csv", simulation_time=1800.0, dt=0.1,
+             sim_mode="tick", use_tuner=False, tuner_mode="linear", use_core_assigner=False,
+             use_comm_links=False, profile=False, assigner_mode="greedy", assign_time_budget=5.0,
+             trace_file=None, model_cache=None, quiet_load=False, sensitivity=False, monte_carlo=0,
+             steady_state="off"):
+    tasks_csv = os.path.join(test_case_folder, "tasks.csv")
+    arch_csv = os.path.join(test_case_folder, "architecture.csv")
+    budgets_csv = os.path.join(test_case_folder, "budgets.csv")
 
 
     for fpath in (tasks_csv, arch_csv, budgets_csv):
         if not os.path.exists(fpath):
             print(f"Missing file: {fpath}")
-            return
+            return None
 
-    print(f"Running test case from: {TEST_CASE_FOLDER}")
+    print(f"Running test case from: {test_case_folder}")
 
+    if profile:
+        instrumentation.enable()
+        instrumentation.reset()
 
-    system_model = load_csv_files(tasks_csv, arch_csv, budgets_csv, use_comm_links=False)
+    with instrumentation.phase("load"):
+        system_model = load_csv_files(tasks_csv, arch_csv, budgets_csv, use_comm_links=use_comm_links,
+                                      cache_dir=model_cache, quiet=quiet_load)
 
-    if USE_TUNER:
+    if use_tuner:
         print("\n Running resource-model tuner …")
-        tune_system(system_model)
+        tune_system(system_model, mode=tuner_mode)
         print("  Tuning finished.\n")
     else:
         print("\n Skipping resource-model tuner.\n")
 
-    if USE_CORE_ASSIGNER:
-        assignments = assign_components_to_cores(system_model)
+    if use_core_assigner:
+        if assigner_mode == "greedy":
+            assignments = assign_components_to_cores(system_model)
+        elif assigner_mode == "anneal":
+            best = search_assignment(system_model, time_budget=assign_time_budget, apply=True)
+            assignments = best["assignment"]
+            print(f" Assignment search: {best['iterations']} moves over {best['chains']} chains, "
+                  f"bandwidth={best['bandwidth']:.3f}, min slack={best['min_slack']:.3f}, "
+                  f"violations={best['violations']}")
+        else:
+            assignments = assign_components(system_model, strategy=assigner_mode, apply=True)
         print(" Core assignment completed:")
         for comp, core in assignments.items():
-            print(f"  Component {comp} → Core {core}")
+            if core is None:
+                print(f"  Component {comp} → no core admits it, left in place")
+            else:
+                print(f"  Component {comp} → Core {core}")
     else:
         print(" Using static core assignments from budgets.csv.")
 
     simulator = HierarchicalSimulator(system_model)
-    sim_results = simulator.run_simulation(simulation_time=1800.0, dt=0.1)
+    # With steady_state="stop", simulation_time=None runs each core until its state repeats.
+    if trace_file:
+        with TraceSink(trace_file) as sink:
+            sim_results = simulator.run_simulation(simulation_time=simulation_time, dt=dt, mode=sim_mode,
+                                                   trace=sink, steady_state=steady_state)
+        print(f" Trace with {sink.count} events written to: {trace_file}")
+    else:
+        sim_results = simulator.run_simulation(simulation_time=simulation_time, dt=dt, mode=sim_mode,
+                                               steady_state=steady_state)
+
+    for core_id, cycle in sim_results.get("steady_state", {}).items():
+        if cycle is None:
+            print(f" Core {core_id}: no repeated state found")
+        else:
+            print(f" Core {core_id}: steady state from t={cycle['start']:g}, repeating every "
+                  f"{cycle['length']:g} (detected at t={cycle['detected_at']:g})")
 
     print("\n=== SIMULATION RESULTS ===")
     for task_id, stats in sim_results["task_stats"].items():
@@ -99,11 +157,38 @@ def main():
             for task in comp["tasks"]:
                 task_to_comp[task["id"]] = (core["core_id"], comp["name"])
 
-    if OUTPUT_CSV:
-        write_solution_csv(sim_results["task_stats"], analysis_res, task_to_comp, filename=OUTPUT_CSV)
-        print(f"\n Results written to: {OUTPUT_CSV}")
+    if output_csv:
+        write_solution_csv(sim_results["task_stats"], analysis_res, task_to_comp, filename=output_csv)
+        print(f"\n Results written to: {output_csv}")
+
+    if sensitivity:
+        margins_csv = os.path.splitext(output_csv or "solution.csv")[0] + "_margins.csv"
+        write_margins_csv(compute_margins(system_model), margins_csv)
+        print(f" Margins written to: {margins_csv}")
+
+    if monte_carlo:
+        mc = run_monte_carlo(system_model, variants=monte_carlo, simulation_time=simulation_time)
+        mc_csv = os.path.splitext(output_csv or "solution.csv")[0] + "_montecarlo.csv"
+        write_monte_carlo_csv(mc, mc_csv)
+        risky = sum(1 for st in mc["tasks"].values() if st["misses"])
+        print(f" Monte Carlo: {monte_carlo} variants, {risky} task(s) missed deadlines; written to: {mc_csv}")
+
+    if profile:
+        base = os.path.splitext(output_csv or "solution.csv")[0]
+        instrumentation.write_report(f"{base}_profile.json", f"{base}_profile.csv")
+        instrumentation.enable(False)
+        print(f" Profile written to: {base}_profile.json")
 
     print("\n Simulation + analysis complete.")
 
+    comp_flags = [res["bdr"]["schedulable"] for comps in analysis_res.values() for res in comps.values()]
+    return {
+        "tasks": len(sim_results["task_stats"]),
+        "missed_deadlines": sum(st["missed_deadlines"] for st in sim_results["task_stats"].values()),
+        "components": len(comp_flags),
+        "schedulable_components": sum(comp_flags),
+        "solution": output_csv,
+    }
+
 if __name__ == "__main__":
     main()
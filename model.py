@@ -0,0 +1,148 @@
+from typing import Dict, Any, List, Optional
+
+from dbf_utils import hyperperiod
+
+
+class Task:
+    """One periodic task. wcet is already scaled to its core's speed, as in the loader."""
+    __slots__ = ("id", "wcet", "period", "deadline", "priority", "type", "effective_wcet",
+                 "comm_jitter", "utilization")
+
+    def __init__(self, id: str, wcet: float, period: float, deadline: Optional[float] = None,
+                 priority=None, type: str = "hard", effective_wcet: Optional[float] = None,
+                 comm_jitter: float = 0.0):
+        self.id = id
+        self.wcet = wcet
+        self.period = period
+        self.deadline = period if deadline is None else deadline
+        self.priority = priority
+        self.type = type
+        self.effective_wcet = wcet if effective_wcet is None else effective_wcet
+        self.comm_jitter = comm_jitter
+        self.utilization = wcet / period
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Task":
+        return cls(d["id"], d["wcet"], d["period"], d.get("deadline"), d.get("priority"),
+                   d.get("type", "hard"), d.get("effective_wcet"), d.get("comm_jitter", 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "wcet": self.wcet, "period": self.period, "deadline": self.deadline,
+                "priority": self.priority, "type": self.type,
+                "effective_wcet": self.effective_wcet, "comm_jitter": self.comm_jitter}
+
+
+class Component:
+    """A BDR server (Q, P) with its tasks and nested subcomponents.
+    alpha, delta, utilization and hyperperiod are computed once; change the
+    budget through set_budget() so they stay in step."""
+    __slots__ = ("name", "scheduler", "Q", "P", "priority", "tasks", "subcomponents",
+                 "parent_core", "parent_component", "alpha", "delta", "utilization", "hyperperiod")
+
+    def __init__(self, name: str, scheduler: str, Q: float, P: float, tasks: List[Task],
+                 subcomponents: Optional[List["Component"]] = None, priority=None,
+                 parent_core: Optional[str] = None, parent_component: Optional[str] = None):
+        self.name = name
+        self.scheduler = scheduler.upper()
+        self.priority = priority
+        self.tasks = tasks
+        self.subcomponents = subcomponents or []
+        self.parent_core = parent_core
+        self.parent_component = parent_component
+        self.utilization = sum(t.utilization for t in tasks)
+        self.hyperperiod = hyperperiod([t.period for t in tasks]) if tasks else 0
+        self.set_budget(Q, P)
+
+    def set_budget(self, Q: float, P: float):
+        self.Q = Q
+        self.P = P
+        self.alpha = Q / P
+        self.delta = 2 * (P - Q)
+
+    def iter_components(self):
+        yield self
+        for sub in self.subcomponents:
+            yield from sub.iter_components()
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Component":
+        return cls(d["name"], d["scheduler"], d["bdr_init"]["Q"], d["bdr_init"]["P"],
+                   [Task.from_dict(t) for t in d["tasks"]],
+                   [cls.from_dict(sub) for sub in d.get("subcomponents", [])],
+                   d.get("priority"), d.get("parent_core"), d.get("parent_component"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {"name": self.name, "scheduler": self.scheduler,
+             "bdr_init": {"Q": self.Q, "P": self.P}, "priority": self.priority,
+             "tasks": [t.to_dict() for t in self.tasks],
+             "subcomponents": [sub.to_dict() for sub in self.subcomponents]}
+        # The loader only tags nested components with their parents.
+        if self.parent_component is not None:
+            d["parent_core"] = self.parent_core
+            d["parent_component"] = self.parent_component
+        return d
+
+
+class Core:
+    """A core with its top-level components; all_components is the flattened tree."""
+    __slots__ = ("core_id", "speed_factor", "scheduler", "components", "all_components")
+
+    def __init__(self, core_id: str, speed_factor: float, scheduler: str, components: List[Component]):
+        self.core_id = core_id
+        self.speed_factor = speed_factor
+        self.scheduler = scheduler.upper()
+        self.components = components
+        self.all_components = [c for comp in components for c in comp.iter_components()]
+
+    @property
+    def bandwidth(self) -> float:
+        return sum(c.alpha for c in self.all_components)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Core":
+        return cls(d["core_id"], d["speed_factor"], d["scheduler"],
+                   [Component.from_dict(c) for c in d["components"]])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"core_id": self.core_id, "speed_factor": self.speed_factor,
+                "scheduler": self.scheduler, "components": [c.to_dict() for c in self.components]}
+
+
+class SystemModel:
+    """Typed view of the loader's system_model dict, with flattened lookups.
+    The analysis, simulator and tools run on the dict form: every entry point
+    converts a SystemModel once at the boundary (as_dict_model) and writes
+    edits back (sync_typed_model), and their inner loops use flat arrays."""
+    __slots__ = ("cores", "components", "tasks", "component_by_name", "core_of")
+
+    def __init__(self, cores: List[Core]):
+        self.cores = cores
+        self.components = [c for core in cores for c in core.all_components]
+        self.tasks = [t for c in self.components for t in c.tasks]
+        self.component_by_name = {c.name: c for c in self.components}
+        self.core_of = {c.name: core for core in cores for c in core.all_components}
+
+    @property
+    def utilization(self) -> float:
+        return sum(t.utilization for t in self.tasks)
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "SystemModel":
+        return cls([Core.from_dict(core) for core in d["cores"]])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"cores": [core.to_dict() for core in self.cores]}
+
+
+def as_dict_model(system_model):
+    # Entry points that work on the dict format accept a SystemModel too.
+    return system_model.to_dict() if isinstance(system_model, SystemModel) else system_model
+
+
+def sync_typed_model(system_model, model_dict):
+    # Writes in-place edits made on the dict form (budgets, moved components)
+    # back into the SystemModel it came from; a dict model needs nothing.
+    if isinstance(system_model, SystemModel):
+        fresh = SystemModel.from_dict(model_dict)
+        for field in SystemModel.__slots__:
+            setattr(system_model, field, getattr(fresh, field))
@@ -0,0 +1,177 @@
+import csv
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional
+
+from bdr_analysis import BDRAnalysis
+from model import as_dict_model
+from simulator import HierarchicalSimulator
+
+DISTRIBUTIONS = ("wcet", "uniform", "triangular")
+# Response times are binned as a fraction of the deadline; misses go in the last bin.
+BINS = 100
+# Variants per worker task; fixed so results do not depend on the worker count.
+BATCH_SIZE = 25
+
+
+class JobVariation:
+    """Seeded per-job randomness for one simulator run, e.g.
+    HierarchicalSimulator(model, variation=JobVariation(seed=7)).
+    Execution times are drawn from [bcet_ratio * WCET, WCET]: "uniform",
+    "triangular" (peaking at the low end) or "wcet" (always the WCET);
+    task_dists maps a task id to its own (distribution, bcet_ratio).
+    offsets=True gives every task a random phase in [0, T), sporadic=s
+    stretches each inter-arrival time to T * (1 + U(0, s)), and
+    comm_delays=True delays each arrival by U(0, comm_jitter)."""
+
+    def __init__(self, seed=0, exec_dist="uniform", bcet_ratio=0.5, task_dists=None,
+                 offsets=True, sporadic=0.0, comm_delays=True):
+        for dist, _ in [(exec_dist, bcet_ratio)] + list((task_dists or {}).values()):
+            if dist not in DISTRIBUTIONS:
+                raise ValueError(f"Unknown execution-time distribution: {dist}")
+        self.rng = random.Random(seed)
+        self.exec_dist = exec_dist
+        self.bcet_ratio = bcet_ratio
+        self.task_dists = task_dists or {}
+        self.offsets = offsets
+        self.sporadic = sporadic
+        self.comm_delays = comm_delays
+
+    def bind(self, system_model, tasks):
+        # Called by the simulator once its task table exists; sets the first releases.
+        jitter = {t["id"]: t.get("comm_jitter", 0.0) for core in system_model["cores"]
+                  for comp in BDRAnalysis.iter_components(core) for t in comp["tasks"]}
+        self.wcet = list(tasks.wcet)
+        self.period = list(tasks.period)
+        self.dist = [self.task_dists.get(tid, (self.exec_dist, self.bcet_ratio)) for tid in tasks.ids]
+        self.jitter = [jitter.get(tid, 0.0) if self.comm_delays else 0.0 for tid in tasks.ids]
+        for i in range(len(tasks.ids)):
+            phase = self.rng.uniform(0.0, self.period[i]) if self.offsets else 0.0
+            tasks.delay[i] = self.arrival_delay(i)
+            tasks.next_release[i] = phase + tasks.delay[i]
+
+    def exec_time(self, i):
+        C = self.wcet[i]
+        dist, ratio = self.dist[i]
+        if dist == "uniform":
+            return self.rng.uniform(ratio * C, C)
+        if dist == "triangular":
+            return self.rng.triangular(ratio * C, C, ratio * C)
+        return C
+
+    def arrival_delay(self, i):
+        J = self.jitter[i]
+        return self.rng.uniform(0.0, J) if J > 0 else 0.0
+
+    def gap(self, i):
+        T = self.period[i]
+        return T * (1.0 + self.rng.uniform(0.0, self.sporadic)) if self.sporadic > 0 else T
+
+
+def _new_stats():
+    # [histogram, jobs, misses, variants with a miss, max response, total response]
+    return [[0] * (BINS + 1), 0, 0, 0, 0.0, 0.0]
+
+
+def _run_batch(system_model, seeds, simulation_time, options):
+    # Event-driven runs of the given seeds, reduced to per-task statistics.
+    stats = {}
+    for seed in seeds:
+        sim = HierarchicalSimulator(system_model, variation=JobVariation(seed, **options))
+        deadline = dict(zip(sim.tasks.ids, sim.tasks.deadline))
+        for tid in deadline:
+            stats.setdefault(tid, _new_stats())
+        missed = set()
+        for _, event, tid, _, resp in sim.iter_events(simulation_time, mode="event"):
+            if event == "complete":
+                st = stats[tid]
+                st[0][min(int(resp / deadline[tid] * BINS), BINS - 1)] += 1
+                st[1] += 1
+                st[4] = max(st[4], resp)
+                st[5] += resp
+            elif event == "miss":
+                st = stats[tid]
+                st[0][BINS] += 1
+                st[1] += 1
+                st[2] += 1
+                missed.add(tid)
+        for tid in missed:
+            stats[tid][3] += 1
+    return stats
+
+
+def _percentile(hist, jobs, q, D):
+    # Upper edge of the bin holding the q-quantile; inf once it falls among misses.
+    need = q * jobs
+    seen = 0
+    for b, n in enumerate(hist):
+        seen += n
+        if seen >= need and n:
+            return float("inf") if b == BINS else (b + 1) / BINS * D
+    return 0.0
+
+
+def run_monte_carlo(system_model: Dict[str, Any], variants: int = 1000, simulation_time: float = 1800.0,
+                    seed: int = 0, exec_dist: str = "uniform", bcet_ratio: float = 0.5,
+                    task_dists: Optional[Dict[str, Any]] = None, offsets: bool = True,
+                    sporadic: float = 0.0, comm_delays: bool = True,
+                    batch_size: int = BATCH_SIZE, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    # Simulates `variants` seeded variants (seed, seed + 1, ...) in batches
+    # over a process pool and merges them into per-task response-time
+    # histograms and deadline-miss probabilities. The result depends only on
+    # the seeds (and, in the last float digits, batch_size), not on the
+    # number of workers.
+    model = as_dict_model(system_model)
+    options = {"exec_dist": exec_dist, "bcet_ratio": bcet_ratio, "task_dists": task_dists,
+               "offsets": offsets, "sporadic": sporadic, "comm_delays": comm_delays}
+    JobVariation(**options)  # rejects unknown distributions before the pool starts
+    seeds = list(range(seed, seed + variants))
+    batches = [seeds[k:k + batch_size] for k in range(0, variants, batch_size)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        parts = list(pool.map(_run_batch, [model] * len(batches), batches,
+                              [simulation_time] * len(batches), [options] * len(batches)))
+
+    merged = {}
+    for part in parts:
+        for tid, st in part.items():
+            m = merged.setdefault(tid, _new_stats())
+            m[0] = [a + b for a, b in zip(m[0], st[0])]
+            m[1] += st[1]
+            m[2] += st[2]
+            m[3] += st[3]
+            m[4] = max(m[4], st[4])
+            m[5] += st[5]
+
+    deadlines = {t["id"]: t["deadline"] for core in model["cores"]
+                 for comp in BDRAnalysis.iter_components(core) for t in comp["tasks"]}
+    tasks = {}
+    for tid, (hist, jobs, misses, variant_misses, max_resp, total_resp) in merged.items():
+        D = deadlines[tid]
+        completed = jobs - misses
+        tasks[tid] = {
+            "deadline": D, "jobs": jobs, "misses": misses,
+            "miss_prob": misses / jobs if jobs else 0.0,
+            "variant_miss_prob": variant_misses / variants,
+            "mean_resp": total_resp / completed if completed else 0.0,
+            "p50_resp": _percentile(hist, jobs, 0.50, D),
+            "p95_resp": _percentile(hist, jobs, 0.95, D),
+            "p99_resp": _percentile(hist, jobs, 0.99, D),
+            "max_resp": max_resp,
+            "histogram": hist,
+        }
+    return {"variants": variants, "simulation_time": simulation_time, "seed": seed, "tasks": tasks}
+
+
+def write_monte_carlo_csv(result, filename):
+    # One row per task; percentiles are bin edges (deadline / BINS wide), inf
+    # when the quantile falls among missed jobs.
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["task_name", "deadline", "jobs", "misses", "miss_prob", "variant_miss_prob",
+                         "mean_resp", "p50_resp", "p95_resp", "p99_resp", "max_resp"])
+        for tid, st in result["tasks"].items():
+            writer.writerow([tid, f"{st['deadline']:g}", st["jobs"], st["misses"],
+                             f"{st['miss_prob']:.6f}", f"{st['variant_miss_prob']:.4f}",
+                             f"{st['mean_resp']:.4f}", f"{st['p50_resp']:.4f}", f"{st['p95_resp']:.4f}",
+                             f"{st['p99_resp']:.4f}", f"{st['max_resp']:.4f}"])
@@ -1,4 +1,7 @@
 from bdr_analysis import BDRAnalysis
+from interface_synthesis import synthesize_component
+import instrumentation
+from model import as_dict_model, sync_typed_model
 
 def _candidate_periods(P0: int):
     seen = set()
@@ -12,10 +15,111 @@ def _candidate_periods(P0: int):
             yield P
         k += 1
 
-def tune_system(system_model):
+def _check_candidate(analyser, cid, speed, comp, Q, P):
+    # Returns None when (Q, P) passes, otherwise "component" or "core".
+    comp["bdr_init"]["Q"] = Q
+    comp["bdr_init"]["P"] = P
 
-    analyser = BDRAnalysis(system_model)
-    for core in system_model["cores"]:
+    comp_ok, *_ = analyser.analyze_component(comp, speed)
+    if not comp_ok["bdr"]["schedulable"]:
+        return "component"
+
+    core_res = analyser.analyze_core(cid, comp["name"])
+    for res in core_res.values():
+        if not res["bdr"]["schedulable"]:
+            return "core"
+    return None
+
+def _tune_linear(analyser, cid, speed, comp, Q0, P0, counter):
+    alpha = Q0 / P0
+    P_min = 1
+    best_Q, best_P = Q0, P0
+
+    for P in _candidate_periods(P0):
+        if P < P_min:
+            continue
+        Q = alpha * P
+        print(f"    Trying candidate: P={P}, Q={Q:.2f}")
+
+        counter["analyses"] += 1
+        failed = _check_candidate(analyser, cid, speed, comp, Q, P)
+        if failed == "component":
+            print(f"    Failed component check.")
+            continue
+        if failed == "core":
+            print(f"    Failed core check.")
+            break
+
+        best_Q, best_P = Q, P
+        print(f"    Passed! Keeping P={P}, Q={Q:.2f}")
+    return best_Q, best_P
+
+def _tune_bisect(analyser, cid, speed, comp, Q0, P0, counter, P_min, tol, joint):
+    # A smaller P at fixed alpha shrinks Δ = 2P(1 - alpha), and the BDR test
+    # only gets easier as Δ shrinks, so the feasible periods form an interval
+    # [P*, P0] and P* can be bisected. Periods are not rounded to integers.
+    alpha = Q0 / P0
+
+    def passes(Q, P):
+        counter["analyses"] += 1
+        return _check_candidate(analyser, cid, speed, comp, Q, P) is None
+
+    best_Q, best_P = Q0, P0
+    if P_min < P0:
+        if passes(alpha * P_min, P_min):
+            best_P = P_min
+        else:
+            lo, hi = P_min, P0
+            while hi - lo > tol * P0:
+                mid = (lo + hi) / 2
+                if passes(alpha * mid, mid):
+                    hi = mid
+                else:
+                    lo = mid
+            best_P = hi
+        best_Q = alpha * best_P
+
+    if joint:
+        # With P fixed, more budget only adds supply to the component, so the
+        # smallest passing Q is found the same way; this hands spare bandwidth
+        # back to the core for the components tuned after this one.
+        U = sum(t["wcet"] / t["period"] for t in comp["tasks"])
+        lo, hi = U * best_P, best_Q
+        while hi - lo > tol * best_Q:
+            mid = (lo + hi) / 2
+            if passes(mid, best_P):
+                hi = mid
+            else:
+                lo = mid
+        best_Q = hi
+    return best_Q, best_P
+
+def _tune_synthesize(analyser, cid, speed, comp, Q0, P0, counter):
+    # Minimum-bandwidth interface at the current period, read off the demand
+    # curve's convex hull; kept only if the core still passes with it.
+    found = synthesize_component(analyser, comp, speed)
+    counter["analyses"] += found["analyses"] if found else 0
+    if not found or not found["verified"]:
+        print(f"    No feasible interface at P={P0:g}.")
+        return Q0, P0
+    counter["analyses"] += 1
+    if _check_candidate(analyser, cid, speed, comp, found["Q"], found["P"]) is not None:
+        print(f"    Failed core check.")
+        return Q0, P0
+    return found["Q"], found["P"]
+
+def tune_system(system_model, mode="linear", P_min=1.0, tol=1e-3, joint=False):
+    # mode="linear" tries P0//2, P0//3, ... at fixed alpha; mode="bisect"
+    # bisects over real-valued P (and over Q as well when joint=True);
+    # mode="synthesize" computes the minimum alpha at P0 directly.
+    if mode not in ("linear", "bisect", "synthesize"):
+        raise ValueError(f"Unknown tuner mode: {mode}")
+
+    model = as_dict_model(system_model)
+    analyser = BDRAnalysis(model)
+    counter = {"analyses": 0}
+    per_component = {}
+    for core in model["cores"]:
         cid = core["core_id"]
         speed = core["speed_factor"]
 
@@ -33,42 +137,25 @@ def tune_system(system_model):
 
             Q0 = comp["bdr_init"]["Q"]
             P0 = comp["bdr_init"]["P"]
-            alpha = Q0 / P0
-            deadlines = [t["deadline"] for t in comp["tasks"]]
-            P_min = 1
-
-            best_Q, best_P = Q0, P0
-
-            for P in _candidate_periods(P0):
-                if P < P_min:
-                    continue
-                Q = alpha * P
-                print(f"    Trying candidate: P={P}, Q={Q:.2f}")
-
-                comp["bdr_init"]["Q"] = Q
-                comp["bdr_init"]["P"] = P
-
-                comp_ok, *_ = analyser.analyze_component(comp, speed)
-                if not comp_ok["bdr"]["schedulable"]:
-                    print(f"    Failed component check.")
-                    continue
-
-                full_res = analyser.run_analysis()
-                all_good = True
-                for res in full_res[cid].values():
-                    if not res["bdr"]["schedulable"]:
-                        all_good = False
-                        print(f"    Failed core check.")
-                        break
-
-                if all_good:
-                    best_Q, best_P = Q, P
-                    print(f"    Passed! Keeping P={P}, Q={Q:.2f}")
+            before = counter["analyses"]
+
+            with instrumentation.phase("tuner", comp["name"]):
+                if mode == "linear":
+                    best_Q, best_P = _tune_linear(analyser, cid, speed, comp, Q0, P0, counter)
+                elif mode == "synthesize":
+                    best_Q, best_P = _tune_synthesize(analyser, cid, speed, comp, Q0, P0, counter)
                 else:
-                    break
+                    best_Q, best_P = _tune_bisect(analyser, cid, speed, comp, Q0, P0, counter,
+                                                  P_min, tol, joint)
 
+            per_component[comp["name"]] = counter["analyses"] - before
             if (best_P, best_Q) != (P0, Q0):
-                print(f"   • {comp['name']}: P {P0:.0f}→{best_P:.0f}, "
+                print(f"   • {comp['name']}: P {P0:g}→{best_P:g}, α {Q0 / P0:.3f}→{best_Q / best_P:.3f}, "
                       f"Δ {2 * (P0 - Q0):.1f}→{2 * (best_P - best_Q):.1f}")
             comp["bdr_init"]["Q"] = best_Q
             comp["bdr_init"]["P"] = best_P
+            analyser.analyze_core(cid, comp["name"])
+
+    sync_typed_model(system_model, model)
+    print(f" Tuner performed {counter['analyses']} analyses.")
+    return {"analyses": counter["analyses"], "per_component": per_component}
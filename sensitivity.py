@@ -0,0 +1,212 @@
+import csv
+from concurrent.futures import ProcessPoolExecutor
+
+from bdr_analysis import BDRAnalysis
+from model import as_dict_model
+from dbf_utils import np, dbf_edf_array, exceeds, iter_deadline_points, demand_horizon, utilization, MAX_TEST_POINTS
+from wcrt_analysis import RTAEngine, compute_wcrt_edf
+
+
+def _scaled(base, extra, k):
+    # base + k * extra for either numpy arrays or plain lists.
+    if np is not None:
+        return base + k * extra
+    return [b + k * e for b, e in zip(base, extra)]
+
+
+class _ScalingSearch:
+    """The BDR component test (DBF against sbf_bdr plus the WCRT check) as a
+    function of a WCET scaling factor k, where the scaled tasks' WCETs are
+    multiplied by k. The step points do not depend on k, so they are
+    generated once, lazily and in time order, together with the demand of
+    the fixed and the scaled tasks and the supply; a test rescales the
+    cached demand by k up to its own horizon and stops at the first
+    violation. On RM components the response times of the last passing k
+    warm-start the next test, since they only grow with k."""
+
+    def __init__(self, comp, scaled_ids):
+        tasks = comp["tasks"]
+        self.sched = comp["scheduler"].upper()
+        Q, P = comp["bdr_init"]["Q"], comp["bdr_init"]["P"]
+        self.alpha = Q / P
+        self.delta = 2 * (P - Q)
+        self.scaled_ids = scaled_ids
+        self.tasks = [dict(t) for t in tasks]
+        self.base_wcet = [t["wcet"] for t in tasks]
+        self.fixed = [t for t in tasks if t["id"] not in scaled_ids]
+        self.scaled = [t for t in tasks if t["id"] in scaled_ids]
+        self.fixed_u = utilization(self.fixed)
+        self.scaled_u = utilization(self.scaled)
+        self.H = max(BDRAnalysis.lcm_of_periods([t["period"] for t in tasks]),
+                     2 * max(t["deadline"] for t in tasks))
+        # (points, fixed demand, scaled demand at k = 1, supply) per chunk.
+        self.chunks = []
+        self.source = iter_deadline_points(tasks, self.H)
+        self.covered = 0.0
+        self.n_points = 0
+
+        if self.sched != "EDF":
+            self.order = sorted(range(len(tasks)), key=lambda j: tasks[j]["priority"])
+        self.warm = [0.0] * len(tasks)
+
+    def _chunks(self, horizon):
+        # Cached chunks reaching `horizon`, extending the cache as needed.
+        for chunk in self.chunks:
+            if chunk[0][0] > horizon + 1e-9:
+                return
+            yield chunk
+        while self.covered < horizon + 1e-9 and self.source is not None:
+            points = next(self.source, None)
+            if points is None:
+                self.source = None
+                return
+            chunk = (points, dbf_edf_array(self.fixed, points), dbf_edf_array(self.scaled, points),
+                     BDRAnalysis.sbf_bdr_array(self.alpha, self.delta, points))
+            self.chunks.append(chunk)
+            self.covered = float(points[-1])
+            self.n_points += len(points)
+            yield chunk
+
+    def _demand_fits(self, k):
+        # Expects self.tasks already scaled to k; points past the horizon are
+        # tested too when they are already cached, which cannot fail.
+        if self.fixed_u + k * self.scaled_u > self.alpha + 1e-9:
+            return False
+        horizon = demand_horizon(self.tasks, self.alpha, self.delta, self.H)
+        for points, fixed, scaled, supply in self._chunks(horizon):
+            if exceeds(_scaled(fixed, scaled, k), supply):
+                return False
+            if self.n_points > MAX_TEST_POINTS:
+                return False
+        return True
+
+    def fits(self, k):
+        for t, C in zip(self.tasks, self.base_wcet):
+            if t["id"] in self.scaled_ids:
+                t["wcet"] = C * k
+        if not self._demand_fits(k):
+            return False
+
+        if self.sched == "EDF":
+            wcrt = compute_wcrt_edf(self.tasks, self.alpha, self.delta)
+            return all(wcrt[t["id"]] <= t["deadline"] for t in self.tasks)
+
+        levels = [self.tasks[j] for j in self.order]
+        engine = RTAEngine([t["wcet"] for t in levels], [t["period"] for t in levels])
+        response = []
+        for i, t in enumerate(levels):
+            base = t["wcet"] + self.delta + t.get("comm_jitter", 0.0)
+            R = engine.solve(i, base, t["deadline"], self.warm[i])
+            if R > t["deadline"]:
+                return False
+            response.append(R)
+        self.warm = response
+        return True
+
+
+def _max_factor(search, k_cap, tol):
+    # Largest k in [0, k_cap] that passes, to a relative tolerance; the test
+    # only gets harder as k grows, so the passing set is an interval.
+    if search.fits(1.0):
+        if search.fits(k_cap):
+            return k_cap
+        lo, hi = 1.0, k_cap
+    else:
+        lo, hi = 0.0, 1.0
+    while hi - lo > tol * max(lo, tol):
+        mid = (lo + hi) / 2
+        if search.fits(mid):
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _component_margins(comp, tol):
+    # Per-task WCET factors and the uniform factor for the whole component.
+    tasks = comp["tasks"]
+    if not tasks:
+        return {"tasks": {}, "uniform": float("inf")}
+    alpha = comp["bdr_init"]["Q"] / comp["bdr_init"]["P"]
+    U = utilization(tasks)
+    factors = {}
+    for t in tasks:
+        u = t["wcet"] / t["period"]
+        if u == 0:
+            # Scaling a zero WCET changes nothing.
+            factors[t["id"]] = float("inf")
+            continue
+        # Beyond this the component's utilisation alone exceeds alpha. At U = alpha
+        # only the full hyperperiod could decide, so the search stops a tolerance short.
+        k_cap = max(1.0, 1.0 + (alpha - U) / u * (1.0 - tol))
+        factors[t["id"]] = _max_factor(_ScalingSearch(comp, {t["id"]}), k_cap, tol)
+    if U == 0:
+        return {"tasks": factors, "uniform": float("inf")}
+    k_cap = max(1.0, 1.0 + (alpha / U - 1.0) * (1.0 - tol))
+    uniform = _max_factor(_ScalingSearch(comp, {t["id"] for t in tasks}), k_cap, tol)
+    return {"tasks": factors, "uniform": uniform}
+
+
+def compute_margins(system_model, tol=1e-3, parallel=True, max_workers=None):
+    # For every task, the largest WCET scaling factor that keeps its component
+    # and core schedulable (BDR verdict, interfaces (Q, P) fixed); for every
+    # core, the smallest speed factor that does the same for all its components.
+    # A core whose server-level test fails gets factor 0 and no minimum speed;
+    # a core without tasks has no minimum speed and factor inf.
+    system_model = as_dict_model(system_model)
+    analyser = BDRAnalysis(system_model)
+    jobs = []
+    for core in system_model["cores"]:
+        for comp in BDRAnalysis.iter_components(core):
+            jobs.append((core, comp))
+
+    comps = [{k: comp[k] for k in ("name", "scheduler", "bdr_init", "tasks")} for _, comp in jobs]
+    if parallel and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            found = list(pool.map(_component_margins, comps, [tol] * len(comps)))
+    else:
+        found = [_component_margins(comp, tol) for comp in comps]
+
+    margins = {"tasks": {}, "cores": {}}
+    by_core = {}
+    for (core, comp), res in zip(jobs, found):
+        by_core.setdefault(core["core_id"], []).append((comp, res))
+
+    for core in system_model["cores"]:
+        cid = core["core_id"]
+        entries = by_core.get(cid, [])
+        servers = [{"Q": comp["bdr_init"]["Q"], "P": comp["bdr_init"]["P"],
+                    "J": 2 * (comp["bdr_init"]["P"] - comp["bdr_init"]["Q"]),
+                    "priority": comp.get("priority"), "name": comp["name"]} for comp, _ in entries]
+        server_ok = not servers or analyser.servers_schedulable(core["scheduler"].upper(), servers)
+        speed = core["speed_factor"]
+        for comp, res in entries:
+            for t in comp["tasks"]:
+                k = res["tasks"][t["id"]] if server_ok else 0.0
+                wcet = t["wcet"] * speed
+                # A zero WCET has factor inf (or 0 on a failed core); 0 * inf would be nan.
+                max_wcet = wcet * k if wcet else k
+                margins["tasks"][t["id"]] = {"core": cid, "component": comp["name"],
+                                             "wcet": wcet, "max_wcet": max_wcet, "factor": k}
+        g = min((res["uniform"] for _, res in entries), default=float("inf"))
+        min_speed = speed / g if server_ok and 0 < g < float("inf") else None
+        margins["cores"][cid] = {"speed": speed, "min_speed": min_speed, "server_test": server_ok}
+    return margins
+
+
+def write_margins_csv(margins, filename):
+    # One row per task (WCETs in tasks.csv units) and one per core; factor is
+    # how far the current value can move before schedulability is lost.
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["kind", "core_id", "component_id", "task_name", "current", "limit", "factor"])
+        for tid, m in margins["tasks"].items():
+            writer.writerow(["task", m["core"], m["component"], tid,
+                             f"{m['wcet']:.4f}", f"{m['max_wcet']:.4f}", f"{m['factor']:.4f}"])
+        for cid, m in margins["cores"].items():
+            if m["min_speed"] is None:
+                factor = "inf" if m["server_test"] else "0.0000"
+                writer.writerow(["core", cid, "", "", f"{m['speed']:.4f}", "", factor])
+            else:
+                writer.writerow(["core", cid, "", "", f"{m['speed']:.4f}", f"{m['min_speed']:.4f}",
+                                 f"{m['speed'] / m['min_speed']:.4f}"])
@@ -1,137 +1,586 @@
-from typing import Dict, List, Tuple, Any
+import heapq
+import math
+from array import array
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+import instrumentation
+from model import as_dict_model
+from dbf_utils import hyperperiod
+from typing import Dict, List, Tuple, Any, Optional
+
+STEADY_STATE_MODES = ("off", "extrapolate", "stop")
+# Without a horizon, steady_state="stop" gives up after this many hyperperiods.
+MAX_HYPERPERIODS = 100
+# Relative times, budgets and remaining work are compared at this resolution.
+_STATE_EPS = 1e-6
+
+
+def _buffer(storage, typecode, values):
+    if storage == "array":
+        return array(typecode, values)
+    return list(values)
+
+
+class _TaskTable:
+    """Struct-of-arrays task state; every field is a flat buffer indexed by task slot."""
+    __slots__ = ("ids", "server", "period", "deadline", "wcet", "prio_key",
+                 "next_release", "release", "remaining", "abs_deadline", "has_job", "job_no",
+                 "max_resp", "total_resp", "missed", "completed", "delay")
+
+    def __init__(self, rows, storage):
+        n = len(rows)
+        self.ids = [r["id"] for r in rows]
+        self.server = _buffer(storage, "q", (r["server"] for r in rows))
+        self.period = _buffer(storage, "d", (r["period"] for r in rows))
+        self.deadline = _buffer(storage, "d", (r["deadline"] for r in rows))
+        self.wcet = _buffer(storage, "d", (r["effective_wcet"] for r in rows))
+        self.prio_key = _buffer(storage, "d", (r["prio_key"] for r in rows))
+        self.next_release = _buffer(storage, "d", [0.0] * n)
+        self.release = _buffer(storage, "d", [0.0] * n)
+        self.remaining = _buffer(storage, "d", [0.0] * n)
+        self.abs_deadline = _buffer(storage, "d", [0.0] * n)
+        self.has_job = _buffer(storage, "b", [0] * n)
+        self.job_no = _buffer(storage, "q", [0] * n)
+        self.max_resp = _buffer(storage, "d", [0.0] * n)
+        self.total_resp = _buffer(storage, "d", [0.0] * n)
+        self.missed = _buffer(storage, "q", [0] * n)
+        self.completed = _buffer(storage, "q", [0] * n)
+        # Arrival delay of the next job after its nominal activation (variation only).
+        self.delay = _buffer(storage, "d", [0.0] * n)
+
+
+class _ServerTable:
+    """Struct-of-arrays server state; tasks of server s occupy slots first[s]..last[s]-1."""
+    __slots__ = ("keys", "Q", "P", "alpha", "delta", "next_period_start", "budget",
+                 "edf", "pending", "first", "last", "ready")
+
+    def __init__(self, rows, storage):
+        n = len(rows)
+        self.keys = [r["key"] for r in rows]
+        self.Q = _buffer(storage, "d", (r["Q"] for r in rows))
+        self.P = _buffer(storage, "d", (r["P"] for r in rows))
+        self.alpha = _buffer(storage, "d", (r["alpha"] for r in rows))
+        self.delta = _buffer(storage, "d", (r["delta"] for r in rows))
+        self.next_period_start = _buffer(storage, "d", (r["delta"] for r in rows))
+        self.budget = _buffer(storage, "d", [0.0] * n)
+        self.edf = _buffer(storage, "b", (r["scheduler"] == "EDF" for r in rows))
+        self.pending = _buffer(storage, "q", [0] * n)
+        self.first = _buffer(storage, "q", (r["first"] for r in rows))
+        self.last = _buffer(storage, "q", (r["last"] for r in rows))
+        # Ready heaps hold (key, slot, job_no); an entry is live only while
+        # job_no is still the slot's current job.
+        self.ready: List[List[Tuple[float, int, int]]] = [[] for _ in range(n)]
+
+
+class _CycleDetector:
+    """Watches one group of servers for a repeated state at its hyperperiod
+    boundaries. Budgets, replenishment times and every task's next release,
+    pending job, remaining work and deadline, taken relative to t, decide
+    the rest of the schedule, so once that state recurs the schedule between
+    the two boundaries repeats forever."""
+
+    def __init__(self, sim, servers, extra_periods=()):
+        self.sim = sim
+        self.servers = servers
+        sv, tk = sim.servers, sim.tasks
+        self.slots = [i for s in servers for i in range(sv.first[s], sv.last[s])]
+        periods = [tk.period[i] for i in self.slots] + [sv.P[s] for s in servers] + list(extra_periods)
+        self.H = hyperperiod(periods) if periods else 1.0
+        # Before every server's first replenishment the state is not yet periodic.
+        start = max([sv.delta[s] for s in servers], default=0.0)
+        self.next_check = math.ceil(start / self.H - 1e-9) * self.H
+        self.limit = self.next_check + MAX_HYPERPERIODS * self.H
+        self.seen = {}
+        self.hit = None
+        self.found = None
+
+    def _key(self, t):
+        tk, sv = self.sim.tasks, self.sim.servers
+
+        def q(x):
+            return round(x / _STATE_EPS)
+
+        servers = tuple((q(sv.budget[s]), q(sv.next_period_start[s] - t)) for s in self.servers)
+        tasks = tuple((q(tk.next_release[i] - t), q(tk.remaining[i]), q(tk.abs_deadline[i] - t),
+                       q(tk.release[i] - t)) if tk.has_job[i] else (q(tk.next_release[i] - t),)
+                      for i in self.slots)
+        return servers, tasks
+
+    def _counters(self):
+        tk = self.sim.tasks
+        return [(tk.missed[i], tk.completed[i], tk.total_resp[i], tk.job_no[i]) for i in self.slots]
+
+    def check(self, t):
+        # True once the state at boundary t repeats an earlier boundary's.
+        if t + 1e-9 < self.next_check:
+            return False
+        if t - self.next_check > 1e-6:
+            # No step landed on this boundary; wait for the next one.
+            self.next_check = math.ceil((t - 1e-6) / self.H) * self.H
+            if abs(t - self.next_check) > 1e-6:
+                return False
+        key = self._key(t)
+        self.next_check += self.H
+        if key not in self.seen:
+            self.seen[key] = (t, self._counters())
+            return False
+        self.hit = self.seen[key]
+        t1, before = self.hit
+        tk = self.sim.tasks
+        cycle = {}
+        for i, (missed, completed, total, _) in zip(self.slots, before):
+            cycle[tk.ids[i]] = {"missed_deadlines": tk.missed[i] - missed,
+                                "num_completed_jobs": tk.completed[i] - completed,
+                                "total_resp_time": tk.total_resp[i] - total}
+        self.found = {"start": t1, "length": t - t1, "detected_at": t, "cycle_stats": cycle}
+        return True
+
+    def fast_forward(self, t, end):
+        # Skips the whole cycles that fit before `end`: times move by the
+        # skipped length and counters grow by the per-cycle change.
+        L = self.found["length"]
+        n = math.floor((end - t) / L + 1e-9)
+        if n <= 0:
+            return t
+        shift = n * L
+        tk, sv = self.sim.tasks, self.sim.servers
+        for i, (missed, completed, total, job_no) in zip(self.slots, self.hit[1]):
+            tk.missed[i] += n * (tk.missed[i] - missed)
+            tk.completed[i] += n * (tk.completed[i] - completed)
+            tk.total_resp[i] += n * (tk.total_resp[i] - total)
+            tk.job_no[i] += n * (tk.job_no[i] - job_no)
+            tk.next_release[i] += shift
+            tk.release[i] += shift
+            tk.abs_deadline[i] += shift
+        for s in self.servers:
+            sv.next_period_start[s] += shift
+            # EDF keys are absolute deadlines, so the ready heaps are rebuilt.
+            ready = [(tk.abs_deadline[i] if sv.edf[s] else tk.prio_key[i], i, tk.job_no[i])
+                     for i in range(sv.first[s], sv.last[s]) if tk.has_job[i]]
+            heapq.heapify(ready)
+            sv.ready[s] = ready
+        self.found["fast_forward"] = shift
+        return t + shift
 
 
 class HierarchicalSimulator:
-    def __init__(self, system_model: Dict[str, Any]):
-        self.system_model = system_model
-        self.task_states: Dict[Tuple[str,str], List[Dict[str,Any]]] = {}
-        self.servers: Dict[Tuple[str,str], Dict[str,Any]] = {}
+    def __init__(self, system_model: Dict[str, Any], storage: str = "list", variation=None):
+        # storage="list" keeps each state field in a Python list, "array" in a
+        # contiguous typed array.array buffer (smaller, same results).
+        # variation (e.g. monte_carlo.JobVariation) draws per-job execution
+        # times, release offsets and arrival delays; None runs every job for
+        # its effective_wcet with synchronous periodic releases.
+        if storage not in ("list", "array"):
+            raise ValueError(f"Unknown state storage: {storage}")
+        self.system_model = as_dict_model(system_model)
+        self.storage = storage
+        self.variation = variation
+        self.core_servers: Dict[str, List[int]] = {}
+        # Event buffer of the step being simulated; None unless tracing.
+        self._trace_buf = None
+        # core id -> detected cycle (or None) while steady-state detection is on.
+        self._steady = None
         self.build_state()
 
     def build_state(self):
+        task_rows, srv_rows = [], []
         for core in self.system_model["cores"]:
             cid = core["core_id"]
+            self.core_servers[cid] = []
             for comp in core["components"]:
-                self._init_component(cid, comp, core["speed_factor"])
+                self._init_component(cid, comp, core["speed_factor"], task_rows, srv_rows)
+        self.tasks = _TaskTable(task_rows, self.storage)
+        self.servers = _ServerTable(srv_rows, self.storage)
+        if self.variation is not None:
+            self.variation.bind(self.system_model, self.tasks)
 
-    def _init_component(self, cid, comp, speed):
-        ckey = (cid, comp["name"])
+    def _init_component(self, cid, comp, speed, task_rows, srv_rows):
         Q = float(comp["bdr_init"]["Q"])
         P = float(comp["bdr_init"]["P"])
         α = Q / P
         Δ = 2 * (P - Q)
-        self.servers[ckey] = {"Q":Q, "P":P, "alpha":α, "delta":Δ,
-                              "next_period_start":Δ, "budget_remaining":0.0,
-                              "scheduler":comp["scheduler"].upper()}
-        ts = []
+        s = len(srv_rows)
+        first = len(task_rows)
         for tinfo in comp.get("tasks", []):
-            ts.append({"id":tinfo["id"],"period":tinfo["period"],
-                       "deadline":tinfo["deadline"],"effective_wcet":tinfo["effective_wcet"],
-                       "priority":tinfo.get("priority"),"type":tinfo.get("type","hard"),
-                       "next_release":0.0,"job":None,
-                       "stats":{
-                                "max_resp_time": 0.0,
-                                "missed_deadlines": 0,
-                                "total_resp_time": 0.0,
-                                "num_completed_jobs": 0
-                            }})
-        self.task_states[ckey] = ts
+            prio = tinfo.get("priority")
+            task_rows.append({"id":tinfo["id"],"server":s,"period":tinfo["period"],
+                              "deadline":tinfo["deadline"],"effective_wcet":tinfo["effective_wcet"],
+                              "prio_key":float("inf") if prio is None else prio})
+        srv_rows.append({"key":(cid, comp["name"]), "Q":Q, "P":P, "alpha":α, "delta":Δ,
+                         "scheduler":comp["scheduler"].upper(),
+                         "first":first, "last":len(task_rows)})
+        self.core_servers[cid].append(s)
 
         for sub in comp.get("subcomponents", []):
-            self._init_component(cid, sub, speed)
+            self._init_component(cid, sub, speed, task_rows, srv_rows)
 
-    def run_simulation(self, simulation_time: float, dt: float = 0.1):
-        t = 0.0
+    def run_simulation(self, simulation_time: Optional[float], dt: float = 0.1, mode: str = "tick",
+                       parallel: bool = False, max_workers=None, trace=None, steady_state: str = "off"):
+        # mode="tick" steps the whole system every dt; mode="event" jumps
+        # straight to the next release, deadline, replenishment, budget
+        # exhaustion or job completion and records exact completion times.
+        # parallel=True runs every core in its own worker process.
+        # trace is an optional trace_sink.TraceSink fed from iter_events().
+        # steady_state="extrapolate" checks the state at every hyperperiod
+        # boundary (per core in event mode) and, once it repeats, skips the
+        # whole cycles left before simulation_time and scales the stats to
+        # match; steady_state="stop" returns at that point instead, and then
+        # simulation_time=None means "run until steady state". Both add
+        # "steady_state": core id -> {start, length, detected_at, cycle_stats} or None.
+        if steady_state not in STEADY_STATE_MODES:
+            raise ValueError(f"Unknown steady-state mode: {steady_state}")
+        if steady_state != "off" and self.variation is not None:
+            raise ValueError("Steady-state detection needs deterministic jobs (no variation)")
+        if steady_state == "extrapolate" and trace is not None:
+            raise ValueError("Skipped cycles cannot be traced; use steady_state='stop'")
+        if simulation_time is None and steady_state != "stop":
+            raise ValueError("simulation_time is required unless steady_state='stop'")
+        if parallel:
+            if trace is not None or self.variation is not None:
+                raise ValueError("Tracing and job variation are not supported with parallel=True")
+            return self._run_parallel(simulation_time, dt, mode, max_workers, steady_state)
+        if mode not in ("tick", "event"):
+            raise ValueError(f"Unknown simulation mode: {mode}")
+        self._steady = dict.fromkeys(self.core_servers) if steady_state != "off" else None
+        with instrumentation.phase(f"simulation_{mode}"):
+            if trace is not None:
+                trace.consume(self.iter_events(simulation_time, dt, mode, steady_state))
+                return self._collect_results()
+            if mode == "event":
+                return self._run_event_driven(simulation_time, steady_state)
+            return self._run_ticks(simulation_time, dt, steady_state)
+
+    def iter_events(self, simulation_time: Optional[float], dt: float = 0.1, mode: str = "tick",
+                    steady_state: str = "off"):
+        # Runs the simulation lazily, yielding (time, event, entity, job_no, value)
+        # tuples step by step, so only one step's events are held at a time.
+        # Events are release/start/preempt/complete/miss for tasks and
+        # replenish for servers; value is the response time for complete and
+        # miss, the remaining work for start/preempt and the budget for replenish.
+        # In event mode the per-core timelines are merged into time order.
+        if mode not in ("tick", "event"):
+            raise ValueError(f"Unknown simulation mode: {mode}")
+        self._running = [-1] * len(self.servers.keys)
+        self._steady = dict.fromkeys(self.core_servers) if steady_state != "off" else None
+        try:
+            if mode == "tick":
+                yield from self._traced(self._tick_steps(simulation_time, dt, steady_state))
+            else:
+                yield from heapq.merge(*(self._traced(self._core_event_steps(cid, servers, simulation_time,
+                                                                             steady_state))
+                                         for cid, servers in self.core_servers.items()),
+                                       key=itemgetter(0))
+        finally:
+            self._trace_buf = None
+
+    def _traced(self, steps):
+        # Points the emit buffer at this stream before every step, so several
+        # per-core streams can be interleaved by heapq.merge.
+        buf = []
+        while True:
+            self._trace_buf = buf
+            done = next(steps, None) is None
+            if buf:
+                buf.sort(key=itemgetter(0))
+                yield from buf
+                buf.clear()
+            if done:
+                return
+
+    def _emit(self, t, event, entity, job_no, value):
+        self._trace_buf.append((t, event, entity, job_no, value))
+
+    def _dispatch(self, s, i, t):
+        # Tracing only: records the switch when server s now runs slot i (-1 = nothing).
+        cur = self._running[s]
+        if cur == i:
+            return
+        tk = self.tasks
+        if cur >= 0:
+            self._emit(t, "preempt", tk.ids[cur], tk.job_no[cur], tk.remaining[cur])
+        if i >= 0:
+            self._emit(t, "start", tk.ids[i], tk.job_no[i], tk.remaining[i])
+        self._running[s] = i
+
+    def _run_ticks(self, simulation_time, dt, steady_state="off"):
+        ticks = 0
+        for _ in self._tick_steps(simulation_time, dt, steady_state):
+            ticks += 1
+        instrumentation.count("simulator_ticks", ticks)
+        return self._collect_results()
+
+    def _tick_steps(self, simulation_time, dt, steady_state="off"):
+        # All cores share the tick clock, so the whole system is one cycle
+        # group and its boundaries must also fall on a tick. A summed clock
+        # drifts by more than the 1e-9 release tolerance over a few thousand
+        # ticks, which shifts releases by a tick and breaks the repetition,
+        # so with detection on the clock is k * dt instead.
+        detector = None
+        if steady_state != "off":
+            detector = _CycleDetector(self, list(range(len(self.servers.keys))), [dt])
+            if simulation_time is None:
+                simulation_time = detector.limit
+        t, k = 0.0, 0
         while t < simulation_time - 1e-9:
+            if detector is not None and detector.check(t):
+                for cid in self.core_servers:
+                    self._steady[cid] = detector.found
+                if steady_state == "stop":
+                    return
+                k += round((detector.fast_forward(t, simulation_time) - t) / dt)
+                t = k * dt
+                detector = None
+                continue
             self._release_jobs(t)
             self._replenish_budgets(t)
             self._schedule_jobs(t, dt)
             self._check_deadlines(t)
-            t += dt
-        return self._collect_results()
+            yield t
+            k += 1
+            t = k * dt if steady_state != "off" else t + dt
 
     def _release_jobs(self, t):
-        for tasks in self.task_states.values():
-            for tsk in tasks:
-                if t + 1e-9 >= tsk["next_release"]:
-                    if tsk["job"] is not None:
-                        job = tsk["job"]
-                        resp = t - job["release"]
-                        tsk["stats"]["max_resp_time"] = max(tsk["stats"]["max_resp_time"], resp)
-                        tsk["stats"]["missed_deadlines"] += 1
-                    tsk["job"] = {"release":t,"remaining":tsk["effective_wcet"],
-                                  "deadline":t + tsk["deadline"]}
-                    tsk["next_release"] += tsk["period"]
+        for s in range(len(self.servers.keys)):
+            self._release_server_jobs(s, t)
+
+    def _release_server_jobs(self, s, t):
+        tk, sv = self.tasks, self.servers
+        for i in range(sv.first[s], sv.last[s]):
+            if t + 1e-9 >= tk.next_release[i]:
+                if tk.has_job[i]:
+                    resp = t - tk.release[i]
+                    if resp > tk.max_resp[i]:
+                        tk.max_resp[i] = resp
+                    tk.missed[i] += 1
+                    if self._trace_buf is not None:
+                        self._emit(t, "miss", tk.ids[i], tk.job_no[i], resp)
+                        if self._running[s] == i:
+                            self._running[s] = -1
+                else:
+                    tk.has_job[i] = 1
+                    sv.pending[s] += 1
+                if self.variation is None:
+                    tk.release[i] = t
+                    tk.remaining[i] = tk.wcet[i]
+                    tk.abs_deadline[i] = t + tk.deadline[i]
+                    tk.next_release[i] += tk.period[i]
+                else:
+                    # Deadline and response time count from the nominal activation.
+                    var = self.variation
+                    act = tk.next_release[i] - tk.delay[i]
+                    tk.release[i] = act
+                    tk.remaining[i] = var.exec_time(i)
+                    tk.abs_deadline[i] = act + tk.deadline[i]
+                    tk.delay[i] = var.arrival_delay(i)
+                    tk.next_release[i] = act + var.gap(i) + tk.delay[i]
+                tk.job_no[i] += 1
+                key = tk.abs_deadline[i] if sv.edf[s] else tk.prio_key[i]
+                heapq.heappush(sv.ready[s], (key, i, tk.job_no[i]))
+                if self._trace_buf is not None:
+                    self._emit(t, "release", tk.ids[i], tk.job_no[i], 0.0)
+
+    def _ready_head(self, s):
+        tk = self.tasks
+        ready = self.servers.ready[s]
+        while ready:
+            _, i, job_no = ready[0]
+            if tk.has_job[i] and tk.job_no[i] == job_no:
+                return i
+            heapq.heappop(ready)
+        return -1
 
     def _replenish_budgets(self, t):
-        for server in self.servers.values():
-            if t + 1e-9 >= server["delta"]:
-                while t + 1e-9 >= server["next_period_start"]:
-                    server["budget_remaining"] = server["Q"]
-                    server["next_period_start"] += server["P"]
+        for s in range(len(self.servers.keys)):
+            self._replenish_server(s, t)
 
-    def _schedule_jobs(self, t, dt):
-        for core in self.system_model["cores"]:
-            cid = core["core_id"]
-            active = []
-            total_alpha = 0.0
-            for comp in core["components"]:
-                self._gather_active_components(cid, comp, t, active, total_alpha)
+    def _replenish_server(self, s, t):
+        sv = self.servers
+        if t + 1e-9 >= sv.delta[s]:
+            while t + 1e-9 >= sv.next_period_start[s]:
+                sv.budget[s] = sv.Q[s]
+                sv.next_period_start[s] += sv.P[s]
+                if self._trace_buf is not None:
+                    self._emit(t, "replenish", sv.keys[s][1], 0, sv.Q[s])
+
+    def _complete_job(self, s, i, t_done):
+        tk = self.tasks
+        resp = t_done - tk.release[i]
+        if resp > tk.max_resp[i]:
+            tk.max_resp[i] = resp
+        tk.total_resp[i] += resp
+        tk.completed[i] += 1
+        tk.has_job[i] = 0
+        self.servers.pending[s] -= 1
+        if self._trace_buf is not None:
+            self._emit(t_done, "complete", tk.ids[i], tk.job_no[i], resp)
+            if self._running[s] == i:
+                self._running[s] = -1
 
+    def _is_active(self, s, t):
+        sv = self.servers
+        return sv.pending[s] > 0 and sv.budget[s] > 1e-9 and t + 1e-9 >= sv.delta[s]
+
+    def _schedule_jobs(self, t, dt):
+        tk, sv = self.tasks, self.servers
+        tracing = self._trace_buf is not None
+        for servers in self.core_servers.values():
+            active = [s for s in servers if self._is_active(s, t)]
+            if tracing:
+                for s in servers:
+                    if s not in active:
+                        self._dispatch(s, -1, t)
             if not active:
                 continue
 
-            total_alpha = sum(srv["alpha"] for _, srv, _ in active)
+            total_alpha = sum(sv.alpha[s] for s in active)
             scale = 1.0 / total_alpha if total_alpha > 1.0 + 1e-12 else 1.0
 
-            for ckey, srv, ts in active:
-                share = srv["alpha"] * scale * dt
-                quantum = min(share, srv["budget_remaining"])
+            for s in active:
+                share = sv.alpha[s] * scale * dt
+                quantum = min(share, sv.budget[s])
                 if quantum <= 1e-12:
+                    if tracing:
+                        self._dispatch(s, -1, t)
                     continue
-                jobs = [x for x in ts if x["job"] is not None]
-                if srv["scheduler"] == "EDF":
-                    jobs.sort(key=lambda x: x["job"]["deadline"])
-                else:
-                    jobs.sort(key=lambda x: x.get("priority", float("inf")))
                 rem = quantum
-                for j in jobs:
-                    if rem <= 1e-12:
+                t_at = t
+                while rem > 1e-12:
+                    i = self._ready_head(s)
+                    if i < 0:
                         break
-                    slice_amt = min(rem, j["job"]["remaining"])
-                    j["job"]["remaining"] -= slice_amt
+                    if tracing:
+                        self._dispatch(s, i, t_at)
+                        t_at = t + dt
+                    slice_amt = min(rem, tk.remaining[i])
+                    tk.remaining[i] -= slice_amt
                     rem -= slice_amt
-                    srv["budget_remaining"] -= slice_amt
-                    if j["job"]["remaining"] <= 1e-12:
-                        resp = (t + dt) - j["job"]["release"]
-                        j["stats"]["max_resp_time"] = max(j["stats"]["max_resp_time"], resp)
-                        j["stats"]["total_resp_time"] += resp
-                        j["stats"]["num_completed_jobs"] += 1
-                        j["job"] = None
-
-    def _gather_active_components(self, cid, comp, t, active, total_alpha):
-        ckey = (cid, comp["name"])
-        srv = self.servers[ckey]
-        ts = self.task_states[ckey]
-        has_job = any(x["job"] is not None for x in ts)
-        if has_job and srv["budget_remaining"] > 1e-9 and t + 1e-9 >= srv["delta"]:
-            active.append((ckey, srv, ts))
-            total_alpha += srv["alpha"]
-        for sub in comp.get("subcomponents", []):
-            self._gather_active_components(cid, sub, t, active, total_alpha)
+                    sv.budget[s] -= slice_amt
+                    if tk.remaining[i] <= 1e-12:
+                        self._complete_job(s, i, t + dt)
 
     def _check_deadlines(self, t):
-        for ts in self.task_states.values():
-            for j in ts:
-                if j["job"] is not None and t + 1e-9 >= j["job"]["deadline"]:
-                    j["stats"]["missed_deadlines"] += 1
-                    resp = t - j["job"]["release"]
-                    j["stats"]["max_resp_time"] = max(j["stats"]["max_resp_time"], resp)
-                    j["job"] = None
+        for s in range(len(self.servers.keys)):
+            self._expire_server_jobs(s, t)
+
+    def _expire_server_jobs(self, s, t):
+        tk, sv = self.tasks, self.servers
+        for i in range(sv.first[s], sv.last[s]):
+            if tk.has_job[i] and t + 1e-9 >= tk.abs_deadline[i]:
+                tk.missed[i] += 1
+                resp = t - tk.release[i]
+                if resp > tk.max_resp[i]:
+                    tk.max_resp[i] = resp
+                tk.has_job[i] = 0
+                sv.pending[s] -= 1
+                if self._trace_buf is not None:
+                    self._emit(t, "miss", tk.ids[i], tk.job_no[i], resp)
+                    if self._running[s] == i:
+                        self._running[s] = -1
+
+    def _run_event_driven(self, simulation_time, steady_state="off"):
+        # Cores never share budget, so each one is advanced on its own timeline.
+        for cid, servers in self.core_servers.items():
+            self._simulate_core_events(cid, servers, simulation_time, steady_state)
+        return self._collect_results()
+
+    def _simulate_core_events(self, cid, servers, end, steady_state="off"):
+        events = 0
+        for _ in self._core_event_steps(cid, servers, end, steady_state):
+            events += 1
+        instrumentation.count("simulator_events", events)
+
+    def _core_event_steps(self, cid, servers, end, steady_state="off"):
+        tk, sv = self.tasks, self.servers
+        slots = [i for s in servers for i in range(sv.first[s], sv.last[s])]
+        detector = None
+        if steady_state != "off":
+            detector = _CycleDetector(self, servers)
+            if end is None:
+                end = detector.limit
+        t = 0.0
+        while t < end - 1e-9:
+            if detector is not None and detector.check(t):
+                self._steady[cid] = detector.found
+                if steady_state == "stop":
+                    return
+                t = detector.fast_forward(t, end)
+                detector = None
+                continue
+            for s in servers:
+                self._release_server_jobs(s, t)
+                self._replenish_server(s, t)
+                self._expire_server_jobs(s, t)
+
+            active = [s for s in servers if self._is_active(s, t)]
+            total_alpha = sum(sv.alpha[s] for s in active)
+            scale = 1.0 / total_alpha if total_alpha > 1.0 + 1e-12 else 1.0
+
+            t_next = end
+            for i in slots:
+                if tk.next_release[i] < t_next:
+                    t_next = tk.next_release[i]
+                if tk.has_job[i] and tk.abs_deadline[i] < t_next:
+                    t_next = tk.abs_deadline[i]
+            for s in servers:
+                t_next = min(t_next, max(sv.next_period_start[s], sv.delta[s]))
+
+            if self._trace_buf is not None:
+                for s in servers:
+                    self._dispatch(s, self._ready_head(s) if s in active else -1, t)
+
+            running = []
+            for s in active:
+                rate = sv.alpha[s] * scale
+                i = self._ready_head(s)
+                running.append((s, i, rate))
+                t_next = min(t_next,
+                             t + sv.budget[s] / rate,
+                             t + tk.remaining[i] / rate)
+
+            for s, i, rate in running:
+                amount = min(rate * (t_next - t), sv.budget[s], tk.remaining[i])
+                tk.remaining[i] -= amount
+                sv.budget[s] -= amount
+                if tk.remaining[i] <= 1e-9:
+                    self._complete_job(s, i, t_next)
+                if sv.budget[s] <= 1e-9:
+                    sv.budget[s] = 0.0
+            yield t
+            t = t_next
+
+    def _run_parallel(self, simulation_time, dt, mode, max_workers, steady_state="off"):
+        # Cores never interact, so each one is simulated from its own
+        # single-core model and the per-core task_stats are merged in core order.
+        # The workers own the state: this instance's tables are left untouched.
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_simulate_core_job, core, simulation_time, dt, mode, self.storage,
+                                   steady_state)
+                       for core in self.system_model["cores"]]
+            out = {"task_stats":{}}
+            if steady_state != "off":
+                out["steady_state"] = {}
+            for future in futures:
+                res = future.result()
+                out["task_stats"].update(res["task_stats"])
+                if steady_state != "off":
+                    out["steady_state"].update(res["steady_state"])
+        return out
 
     def _collect_results(self):
+        tk = self.tasks
         out = {"task_stats":{}}
-        for ts in self.task_states.values():
-            for j in ts:
-                out["task_stats"][j["id"]] = j["stats"]
+        for i, tid in enumerate(tk.ids):
+            out["task_stats"][tid] = {
+                "max_resp_time": tk.max_resp[i],
+                "missed_deadlines": tk.missed[i],
+                "total_resp_time": tk.total_resp[i],
+                "num_completed_jobs": tk.completed[i]
+            }
+        if self._steady is not None:
+            out["steady_state"] = dict(self._steady)
         return out
+
+
+def _simulate_core_job(core, simulation_time, dt, mode, storage, steady_state="off"):
+    sim = HierarchicalSimulator({"cores": [core]}, storage=storage)
+    return sim.run_simulation(simulation_time, dt, mode, steady_state=steady_state)
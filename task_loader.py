@@ -1,5 +1,12 @@
 import csv
+import hashlib
 import os
+import pickle
+
+from model import SystemModel
+
+# Bump when the layout of the built system_model changes.
+MODEL_CACHE_VERSION = 1
 
 def load_comm_links(filepath):
     comm_map = {}
@@ -13,7 +20,55 @@ def load_comm_links(filepath):
             comm_map[dst] = max(comm_map.get(dst, 0.0), delay)
     return comm_map
 
-def load_csv_files(tasks_csv, arch_csv, budgets_csv, use_comm_links=False):
+def _file_signature(path):
+    # (size, mtime) is enough to notice edits without reading the file.
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def load_csv_files(tasks_csv, arch_csv, budgets_csv, use_comm_links=False,
+                   cache_dir=None, quiet=False):
+    # With cache_dir set, the built model is pickled there, keyed on the input
+    # files' sizes/mtimes and use_comm_links, and reloaded while they match.
+    # quiet=True suppresses all console output.
+    log = (lambda *args: None) if quiet else print
+    if cache_dir is None:
+        return _build_model(tasks_csv, arch_csv, budgets_csv, use_comm_links, log)
+
+    inputs = [os.path.abspath(p) for p in (tasks_csv, arch_csv, budgets_csv)]
+    if use_comm_links:
+        inputs.append(os.path.join(os.path.dirname(inputs[0]), "comm_links.csv"))
+    digest = hashlib.sha1(repr((inputs, use_comm_links)).encode()).hexdigest()[:16]
+    cache_path = os.path.join(cache_dir, f"{digest}.pickle")
+    signature = (MODEL_CACHE_VERSION, [(p, _file_signature(p)) for p in inputs], use_comm_links)
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached_signature, system_model = pickle.load(f)
+            if cached_signature == signature:
+                log(f" Loaded system model from cache: {cache_path}")
+                return system_model
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+
+    system_model = _build_model(tasks_csv, arch_csv, budgets_csv, use_comm_links, log)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write-then-rename so concurrent batch workers never read a partial file.
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((signature, system_model), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return system_model
+
+def load_system_model(tasks_csv, arch_csv, budgets_csv, use_comm_links=False,
+                      cache_dir=None, quiet=False):
+    # Same as load_csv_files, returned as a typed model.SystemModel.
+    return SystemModel.from_dict(load_csv_files(tasks_csv, arch_csv, budgets_csv, use_comm_links,
+                                                cache_dir, quiet))
+
+def _build_model(tasks_csv, arch_csv, budgets_csv, use_comm_links, log):
     cores_info = {}
     with open(arch_csv, "r") as f:
         reader = csv.DictReader(f)
@@ -71,7 +126,7 @@ def load_csv_files(tasks_csv, arch_csv, budgets_csv, use_comm_links=False):
 
             scheduler = comp_info[component_id]["scheduler"]
             if priority is None and scheduler in ["FPS", "RM"]:
-                print(f"⚠️ Warning: Task {task_name} in component {component_id} has no priority! Auto-assigning RM priority based on period.")
+                log(f"⚠️ Warning: Task {task_name} in component {component_id} has no priority! Auto-assigning RM priority based on period.")
                 priority = period
 
             comp_info[component_id]["tasks"].append({
@@ -88,10 +143,10 @@ def load_csv_files(tasks_csv, arch_csv, budgets_csv, use_comm_links=False):
         for cid in children:
             comp_info[parent]["subcomponents"].append(comp_info[cid])
 
-    print("=== Component Task Assignment ===")
+    log("=== Component Task Assignment ===")
     for comp_id, comp in comp_info.items():
         task_ids = [t["id"] for t in comp["tasks"]]
-        print(f"Component {comp_id} (Scheduler: {comp['scheduler']}) has tasks: {task_ids}")
+        log(f"Component {comp_id} (Scheduler: {comp['scheduler']}) has tasks: {task_ids}")
 
 
     for cinfo in comp_info.values():
@@ -144,6 +199,6 @@ def load_csv_files(tasks_csv, arch_csv, budgets_csv, use_comm_links=False):
                 task["comm_jitter"] = comm_map.get(task["id"], 0.0)
 
     if comm_map:
-        print(f" Loaded communication delays for {len(comm_map)} tasks from comm_links.csv")
+        log(f" Loaded communication delays for {len(comm_map)} tasks from comm_links.csv")
 
     return system_model
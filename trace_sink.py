@@ -0,0 +1,110 @@
+import csv
+import struct
+
+EVENTS = ("release", "start", "preempt", "complete", "miss", "replenish")
+_CODES = {name: code for code, name in enumerate(EVENTS)}
+
+# Binary layout: magic, then records of (event code, time, entity index,
+# job_no, value). An entity's name is written once, as a NAME record just
+# before its first use, so the file can be streamed without an index.
+_MAGIC = b"HSTRACE1"
+_RECORD = struct.Struct("<BdIId")
+_NAME = struct.Struct("<BIH")
+_NAME_CODE = 255
+
+CSV_HEADER = ["time", "event", "entity", "job", "value"]
+
+
+class TraceSink:
+    """Buffered writer for simulator events, e.g.
+    sim.run_simulation(T, trace=TraceSink("trace.csv")). Events are kept in a
+    fixed-size buffer and flushed in batches, so memory does not grow with
+    the simulation horizon."""
+
+    def __init__(self, path, fmt=None, buffer_size=8192):
+        self.fmt = fmt or ("csv" if path.endswith(".csv") else "bin")
+        if self.fmt not in ("csv", "bin"):
+            raise ValueError(f"Unknown trace format: {self.fmt}")
+        self.path = path
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._buffer = []
+        if self.fmt == "csv":
+            self._file = open(path, "w", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(CSV_HEADER)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_MAGIC)
+            self._names = {}
+
+    def write(self, event):
+        self._buffer.append(event)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def consume(self, events):
+        for event in events:
+            self._buffer.append(event)
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+        self.flush()
+        return self.count
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self.fmt == "csv":
+            self._writer.writerows((f"{t:.9g}", event, entity, job_no, f"{value:.9g}")
+                                   for t, event, entity, job_no, value in self._buffer)
+        else:
+            self._file.write(b"".join(self._pack(e) for e in self._buffer))
+        self.count += len(self._buffer)
+        self._buffer.clear()
+
+    def _pack(self, event):
+        t, kind, entity, job_no, value = event
+        idx = self._names.get(entity)
+        prefix = b""
+        if idx is None:
+            idx = self._names[entity] = len(self._names)
+            raw = str(entity).encode("utf-8")
+            prefix = _NAME.pack(_NAME_CODE, idx, len(raw)) + raw
+        return prefix + _RECORD.pack(_CODES[kind], t, idx, job_no, value)
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def read_trace(path):
+    # Yields (time, event, entity, job_no, value) from a CSV or binary trace.
+    with open(path, "rb") as f:
+        binary = f.read(len(_MAGIC)) == _MAGIC
+    if not binary:
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield (float(row["time"]), row["event"], row["entity"],
+                       int(row["job"]), float(row["value"]))
+        return
+
+    names = []
+    with open(path, "rb") as f:
+        f.read(len(_MAGIC))
+        while True:
+            head = f.read(1)
+            if not head:
+                return
+            if head[0] == _NAME_CODE:
+                _, idx, length = _NAME.unpack(head + f.read(_NAME.size - 1))
+                names.append(f.read(length).decode("utf-8"))
+                continue
+            code, t, idx, job_no, value = _RECORD.unpack(head + f.read(_RECORD.size - 1))
+            yield t, EVENTS[code], names[idx], job_no, value
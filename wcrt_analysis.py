@@ -1,61 +1,141 @@
 import math
-from typing import List, Dict
+from bisect import insort
+from typing import List, Dict, Optional
+import instrumentation
 
-def compute_wcrt_rm(tasks: List[Dict], delta: float) -> Dict[str, float]:
+class RTAEngine:
+    """Fixed-point response-time iteration R = base + sum(ceil((R + J_j) / T_j) * C_j)
+    over the higher-priority entries j < i of a priority-ordered list."""
+
+    def __init__(self, wcets: List[float], periods: List[float], jitters: Optional[List[float]] = None):
+        self.C = list(wcets)
+        self.T = list(periods)
+        self.J = list(jitters) if jitters is not None else None
+        self.iterations = 0
+        self.level_iterations = [0] * len(self.C)
+
+    def interference(self, i: int, R: float) -> float:
+        ceil = math.ceil
+        if self.J is None:
+            return sum([ceil(R / T) * C for C, T in zip(self.C[:i], self.T[:i])])
+        return sum([ceil((R + J) / T) * C for C, T, J in zip(self.C[:i], self.T[:i], self.J[:i])])
+
+    def solve(self, i: int, base: float, limit: float, start: float = 0.0, tol: float = 1e-6) -> float:
+        # Any start below the least fixed point is valid; returns inf once an
+        # unconverged iterate passes `limit`.
+        R = max(base, start)
+        while True:
+            self.iterations += 1
+            self.level_iterations[i] += 1
+            R_next = base + self.interference(i, R)
+            if R_next == R or abs(R_next - R) < tol:
+                return R_next
+            if R_next > limit:
+                return float("inf")
+            R = R_next
+
+
+def compute_wcrt_rm(tasks: List[Dict], delta: float,
+                    iterations: Optional[Dict[str, int]] = None) -> Dict[str, float]:
     results = {}
     sorted_tasks = sorted(tasks, key=lambda x: x["priority"])
+    engine = RTAEngine([t["wcet"] for t in sorted_tasks], [t["period"] for t in sorted_tasks])
+    warm, prev_J = 0.0, 0.0
     for i, task in enumerate(sorted_tasks):
         Ci = task["wcet"]
         Di = task["deadline"]
         J = task.get("comm_jitter", 0.0)
-        Ri = Ci + delta + J
-        while True:
-            interference = sum(
-                math.ceil(Ri / hp["period"]) * hp["wcet"]
-                for hp in sorted_tasks[:i]
-            )
-            R_next = Ci + delta + J + interference
-            if abs(R_next - Ri) < 1e-6:
-                break
-            if R_next > Di:
-                R_next = float("inf")
-                break
-            Ri = R_next
-        results[task["id"]] = R_next
+        base = Ci + delta + J
+        # f_i(R) >= f_{i-1}(R) + Ci + J - J_{i-1}, so the previous level's
+        # response time is a lower bound for this one whenever that is >= 0.
+        start = warm if Ci + J - prev_J >= 0 else 0.0
+        R = engine.solve(i, base, Di, start)
+        if R == float("inf"):
+            warm = max(base, start)
+        else:
+            warm = R
+            if R > Di and max(base, start) != base:
+                # From a cold start this iteration would have crossed Di first.
+                R = float("inf")
+        prev_J = J
+        results[task["id"]] = R
+        if iterations is not None:
+            iterations[task["id"]] = engine.level_iterations[i]
+        instrumentation.add("rta_iterations", task["id"], engine.level_iterations[i])
+    instrumentation.count("rta_iterations", engine.iterations)
     return results
 
-def dbf_edf(tasks: List[Dict], t: float) -> float:
-    demand = 0.0
-    for task in tasks:
-        C, T, D = task["wcet"], task["period"], task["deadline"]
-        if t >= D:
-            n_jobs = math.floor((t - D) / T + 1)
-            demand += max(0, n_jobs) * C
-    return demand
-
-def compute_wcrt_edf(tasks: List[Dict], alpha: float, delta: float) -> Dict[str, float]:
+def compute_wcrt_edf(tasks: List[Dict], alpha: float, delta: float,
+                     exact: bool = False) -> Dict[str, float]:
+    # R_i is the first t >= D_i + J_i with dbf(prefix, t - J_i) <= alpha*(t - delta).
+    # Demand is piecewise constant, so instead of testing every integer t we walk
+    # the prefix's step points and invert the supply line inside each interval.
+    # exact=False keeps integer granularity; exact=True returns the real-valued t.
     results = {}
     sorted_tasks = sorted(tasks, key=lambda x: x["deadline"])
-    for i, task in enumerate(sorted_tasks):
+    if not sorted_tasks:
+        return results
+    x_max = 2 * max(t["deadline"] for t in sorted_tasks) - min(0.0, min(
+        t.get("comm_jitter", 0.0) for t in sorted_tasks))
+
+    def fits(t, demand):
+        return demand <= max(0.0, alpha * (t - delta)) + 1e-9
+
+    steps: Dict[float, float] = {}
+    xs: List[float] = []
+    max_d = 0.0
+    for task in sorted_tasks:
         Di = task["deadline"]
         J = task.get("comm_jitter", 0.0)
-        max_t = max(t["deadline"] for t in sorted_tasks[:i + 1]) * 2
+        max_d = max(max_d, Di)
+        max_t = max_d * 2
+
+        # Grow the prefix demand curve by this task's steps; earlier tasks' steps are reused.
+        C, T = task["wcet"], task["period"]
+        m = 0
+        while Di + m * T <= x_max + 1e-9:
+            x = Di + m * T
+            if x not in steps:
+                steps[x] = 0.0
+                insort(xs, x)
+            steps[x] += C
+            m += 1
+
+        lo = Di + J if exact else int(Di + J)
+        demand, k = 0.0, 0
         R = float("inf")
-        for t in range(int(Di + J), int(max_t) + 1):
-            demand = dbf_edf(sorted_tasks[:i + 1], t - J)
-            supply = max(0.0, alpha * (t - delta))
-            if demand <= supply + 1e-9:
-                R = t
+        while lo <= max_t:
+            while k < len(xs) and xs[k] + J <= lo + 1e-9:
+                demand += steps[xs[k]]
+                k += 1
+            nxt = xs[k] + J if k < len(xs) else float("inf")
+            if fits(lo, demand):
+                t = lo
+            elif alpha <= 0:
+                break
+            elif exact:
+                t = max(lo, delta + (demand - 1e-9) / alpha)
+            else:
+                t = max(lo, math.ceil(delta + (demand - 1e-9) / alpha))
+                while t > lo and fits(t - 1, demand):
+                    t -= 1
+                while not fits(t, demand):
+                    t += 1
+            if t < nxt - 1e-9:
+                if t <= max_t:
+                    R = t
                 break
+            lo = nxt if exact else math.ceil(nxt - 1e-9)
         results[task["id"]] = R
     return results
 
-def compute_wcrt(tasks: List[Dict], scheduler: str, alpha: float, delta: float) -> Dict[str, float]:
+def compute_wcrt(tasks: List[Dict], scheduler: str, alpha: float, delta: float,
+                 exact: bool = False) -> Dict[str, float]:
     sched = scheduler.upper()
     if sched in {"FPS", "RM"}:
         return compute_wcrt_rm(tasks, delta)
     elif sched == "EDF":
-        return compute_wcrt_edf(tasks, alpha, delta)
+        return compute_wcrt_edf(tasks, alpha, delta, exact)
 
     else:
         raise ValueError(f"Unknown scheduler: {scheduler}")
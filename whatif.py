@@ -0,0 +1,152 @@
+import time
+from typing import Dict, Any, Optional
+
+from bdr_analysis import BDRAnalysis
+from greedy_core_assigner import apply_assignment
+
+TASK_FIELDS = ("wcet", "period", "deadline", "priority", "comm_jitter")
+
+
+class WhatIfSession:
+    """An analysed system_model that accepts edits and re-checks only what they touch.
+    Each edit re-analyses the edited component(s) and re-runs the server test
+    of the affected core(s); every other component keeps its cached result.
+    Edits return a diff of schedulability and WCRT changes and can be undone.
+    A SystemModel is converted once; edits then apply to session.system_model."""
+
+    def __init__(self, system_model: Dict[str, Any], analyser: Optional[BDRAnalysis] = None):
+        self.analyser = analyser or BDRAnalysis(system_model)
+        self.system_model = self.analyser.system_model
+        self.results = self.analyser.run_analysis()
+        self._undo = []
+        self._index()
+
+    def _index(self):
+        # task id -> (task, component, core) and component name -> (component, core)
+        self.tasks = {}
+        self.components = {}
+        for core in self.system_model["cores"]:
+            for comp in BDRAnalysis.iter_components(core):
+                self.components[comp["name"]] = (comp, core)
+                for task in comp["tasks"]:
+                    self.tasks[task["id"]] = (task, comp, core)
+
+    def set_task(self, task_id: str, **fields) -> Dict[str, Any]:
+        # e.g. set_task("Task_12", wcet=3.3); wcet is in time units of the task's core.
+        unknown = set(fields) - set(TASK_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown task field(s): {sorted(unknown)}")
+        task, comp, core = self.tasks[task_id]
+        old = {k: task.get(k) for k in fields}
+        self._undo.append(("task", task_id, old))
+        self._apply_task(task, fields)
+        return self._reanalyse([(core["core_id"], comp["name"])])
+
+    def scale_wcet(self, task_id: str, factor: float) -> Dict[str, Any]:
+        return self.set_task(task_id, wcet=self.tasks[task_id][0]["wcet"] * factor)
+
+    def set_budget(self, component: str, Q: Optional[float] = None, P: Optional[float] = None) -> Dict[str, Any]:
+        comp, core = self.components[component]
+        bdr = comp["bdr_init"]
+        self._undo.append(("budget", component, (bdr["Q"], bdr["P"])))
+        bdr["Q"] = bdr["Q"] if Q is None else Q
+        bdr["P"] = bdr["P"] if P is None else P
+        return self._reanalyse([(core["core_id"], component)])
+
+    def move_component(self, component: str, core_id: str) -> Dict[str, Any]:
+        # Moves a top-level component (with its subcomponents); WCETs and the
+        # budget are rescaled to the new core's speed as in apply_assignment.
+        comp, home = self.components[component]
+        if not any(c is comp for c in home["components"]):
+            raise ValueError(f"{component} is a subcomponent; move its top-level parent instead")
+        # Rescaling back and forth is not exact in floating point, so undo
+        # restores the original budgets, WCETs and position on the old core.
+        saved = {"values": [(c["bdr_init"]["Q"], [t["wcet"] for t in c["tasks"]])
+                            for c in BDRAnalysis.iter_components({"components": [comp]})],
+                 "index": next(k for k, c in enumerate(home["components"]) if c is comp),
+                 "parent_core": comp.get("parent_core")}
+        self._undo.append(("move", component, (home["core_id"], saved)))
+        return self._move(comp, home, core_id)
+
+    def undo(self) -> Dict[str, Any]:
+        kind, name, old = self._undo.pop()
+        if kind == "task":
+            task, comp, core = self.tasks[name]
+            self._apply_task(task, old)
+            return self._reanalyse([(core["core_id"], comp["name"])])
+        if kind == "budget":
+            comp, core = self.components[name]
+            comp["bdr_init"]["Q"], comp["bdr_init"]["P"] = old
+            return self._reanalyse([(core["core_id"], name)])
+        comp, home = self.components[name]
+        return self._move(comp, home, *old)
+
+    @staticmethod
+    def _apply_task(task, fields):
+        task.update(fields)
+        if "wcet" in fields:
+            task["effective_wcet"] = task["wcet"]
+
+    def _move(self, comp, home, core_id, saved=None):
+        if core_id == home["core_id"]:
+            return self._reanalyse([])
+        subtree = list(BDRAnalysis.iter_components({"components": [comp]}))
+        names = [c["name"] for c in subtree]
+        apply_assignment(self.system_model, {comp["name"]: core_id}, {comp["name"]: home})
+        if saved is not None:
+            for c, (Q, wcets) in zip(subtree, saved["values"]):
+                c["bdr_init"]["Q"] = Q
+                for task, wcet in zip(c["tasks"], wcets):
+                    self._apply_task(task, {"wcet": wcet})
+            target = next(core for core in self.system_model["cores"] if core["core_id"] == core_id)
+            target["components"].remove(comp)
+            target["components"].insert(saved["index"], comp)
+            if saved["parent_core"] is None:
+                comp.pop("parent_core", None)
+        for name in names:
+            self.analyser.forget_component(home["core_id"], name)
+        self._index()
+        return self._reanalyse([(home["core_id"], comp["name"]), (core_id, comp["name"])])
+
+    def _reanalyse(self, changes):
+        start = time.perf_counter()
+        before = {}
+        for core_id, _ in changes:
+            before.update(self.results[core_id])
+        for core_id, name in changes:
+            self.results[core_id] = self.analyser.analyze_core(core_id, name)
+        after = {}
+        for core_id, _ in changes:
+            after.update(self.results[core_id])
+        diff = diff_results(before, after)
+        diff["cores"] = sorted({core_id for core_id, _ in changes})
+        diff["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return diff
+
+
+def diff_results(before, after):
+    # Both map component name -> analysis result; only changed entries are kept.
+    diff = {"schedulable": {}, "prm_schedulable": {}, "wcrt": {}, "prm_wcrt": {}}
+    for name in before.keys() | after.keys():
+        old, new = before.get(name), after.get(name)
+        for model, prefix in (("bdr", ""), ("prm", "prm_")):
+            was = old[model]["schedulable"] if old else None
+            now = new[model]["schedulable"] if new else None
+            if was != now:
+                diff[prefix + "schedulable"][name] = (was, now)
+            old_wcrt = old[model]["wcrt"] if old else {}
+            new_wcrt = new[model]["wcrt"] if new else {}
+            for tid in old_wcrt.keys() | new_wcrt.keys():
+                if old_wcrt.get(tid) != new_wcrt.get(tid):
+                    diff[prefix + "wcrt"][tid] = (old_wcrt.get(tid), new_wcrt.get(tid))
+    return diff
+
+
+def format_diff(diff):
+    lines = [f" Re-analysed core(s) {', '.join(diff['cores']) or '-'} in {diff['elapsed_ms']:.2f} ms"]
+    for name, (was, now) in sorted(diff["schedulable"].items()):
+        lines.append(f"   Component {name}: schedulable {was} → {now}")
+    for tid, (was, now) in sorted(diff["wcrt"].items()):
+        lines.append(f"   • Task {tid:<15} WCRT {was if was is None else f'{was:.2f}'} → "
+                     f"{now if now is None else f'{now:.2f}'}")
+    return "\n".join(lines)